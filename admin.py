@@ -0,0 +1,396 @@
+# =========================
+# admin.py
+# =========================
+# Admin / Pookie / trusted / blacklist management and owner tooling
+# (servers, serverinfo, debug, command_stats, reload, sync, restart_service).
+import os, time, platform, aiohttp
+
+import discord
+from discord.ext import commands
+from discord import app_commands
+
+from content_scan import normalizer_stats
+from outbound import scheduler
+import core
+from guild_index import SORTS
+from command_timing import slowest, DEADLINE
+from core import (data, save_data, AM, human_timedelta, is_owner, sync_tree, shard_lines, resolver_lines, content_cache, startup_profile,
+                  guild_index,
+                  start_time, RENDER_API_KEY, RENDER_SERVICE_ID, CLUSTER_ID, CLUSTER_COUNT, SHARD_IDS, SHARDED,
+                  app_cmd_check_admin, app_cmd_check_blacklist, app_cmd_check_pookie_or_owner)
+
+async def reload_extensions(bot:commands.Bot, names:str, state:bool) -> list[str]:
+    # code swap without a restart: the gateway session, snipes, spam windows, raid state and
+    # AFK users all live in core (never reloaded); discord.py keeps the old version on failure
+    wanted = list(bot.extensions) if names.strip().lower() in ("", "all") else [n.strip() for n in names.split(",") if n.strip()]
+    lines = []
+    if state:
+        core.load_state()   # refreshed in place, so every `from core import data` sees it
+        lines.append("state: re-read from storage")
+    for name in wanted:
+        if name not in bot.extensions:
+            lines.append(f"{name}: not loaded")
+            continue
+        t = time.perf_counter()
+        try:
+            await bot.reload_extension(name)
+            lines.append(f"{name}: reloaded ({(time.perf_counter()-t)*1000:.0f} ms)")
+        except Exception as e:
+            lines.append(f"{name}: failed, previous version kept ({type(e).__name__}: {e})")
+    try:
+        if await sync_tree():   # only talks to Discord if commands actually changed
+            lines.append("command tree changed: synced")
+    except Exception as e:
+        lines.append(f"sync failed: {e}")
+    return lines
+
+def _set_member(key:str, uid:int, present:bool):
+    s = set(data.get(key, []))
+    if present: s.add(uid)
+    else: s.discard(uid)
+    data[key] = list(s)
+    save_data(data)
+
+# ---- Invite channel cache for /serverinfo ----
+# Invites stay single-use and short-lived, so they are never reused; what we remember is
+# which channel can mint one (or that none can), so a lookup is one REST call, not dozens.
+INVITE_MAX_AGE = 300      # seconds
+INVITE_TRIES = 3          # channels tried per lookup; only ones where we hold Create Invite
+INVITE_NEG_TTL = 600      # seconds to remember "no invite possible" before trying again
+invite_cache: dict[int, dict] = {}   # guild_id -> {"channel": id or None, "until": ts (None-channel entries only)}
+
+def invite_impossible(g:discord.Guild) -> bool:
+    entry = invite_cache.get(g.id)
+    return bool(entry and entry["channel"] is None and entry["until"] > time.time())
+
+async def make_invite(g:discord.Guild, actor:discord.abc.User) -> discord.Invite|None:
+    old = invite_cache.get(g.id) or {}
+    chans = [c for c in g.text_channels if c.permissions_for(g.me).create_instant_invite]
+    chans.sort(key=lambda c: c.id != old.get("channel"))   # the channel that worked last time goes first
+    for ch in chans[:INVITE_TRIES]:
+        try:
+            inv = await ch.create_invite(max_age=INVITE_MAX_AGE, max_uses=1, unique=True, reason=f"Requested by {actor}")
+        except:
+            continue
+        invite_cache[g.id] = {"channel": ch.id, "until": None}
+        return inv
+    invite_cache[g.id] = {"channel": None, "until": time.time() + INVITE_NEG_TTL}
+    return None
+
+# ---- /servers pages ----
+SERVERS_PER_PAGE = 15
+
+class ServersView(discord.ui.View):
+    def __init__(self, owner_id:int, rows:list[dict], header:str):
+        super().__init__(timeout=180)
+        self.owner_id = owner_id
+        self.rows = rows
+        self.header = header
+        self.page = 0
+        self.pages = max(1, -(-len(rows) // SERVERS_PER_PAGE))
+        self.sync_buttons()
+
+    def sync_buttons(self):
+        self.prev.disabled = self.page == 0
+        self.next.disabled = self.page >= self.pages - 1
+
+    def build_embed(self):
+        start = self.page * SERVERS_PER_PAGE
+        lines = [f"`{start+i+1}.` **{e['name']}** ({e['id']}) — {e['members']} members — shard {e['shard']}"
+                 + (f" — joined <t:{int(e['joined'])}:d>" if e["joined"] else "")
+                 for i, e in enumerate(self.rows[start:start+SERVERS_PER_PAGE])]
+        return AM(0x5865F2, f"Servers — page {self.page+1}/{self.pages}", (self.header + "\n\n" + ("\n".join(lines) or "_No matches._"))[:4096])
+
+    async def interaction_check(self, interaction:discord.Interaction) -> bool:
+        if interaction.user.id != self.owner_id:
+            await interaction.response.send_message("This menu isn't for you.", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="⬅️", style=discord.ButtonStyle.secondary)
+    async def prev(self, interaction:discord.Interaction, button:discord.ui.Button):
+        self.page = max(0, self.page-1)
+        self.sync_buttons()
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+    @discord.ui.button(label="➡️", style=discord.ButtonStyle.secondary)
+    async def next(self, interaction:discord.Interaction, button:discord.ui.Button):
+        self.page = min(self.pages-1, self.page+1)
+        self.sync_buttons()
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+class Admin(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    # ---- Guild index upkeep (the index itself lives in core) ----
+    @commands.Cog.listener()
+    async def on_ready(self):
+        guild_index.rebuild(self.bot.guilds)
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild:discord.Guild):
+        guild_index.upsert(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_update(self, before:discord.Guild, after:discord.Guild):
+        guild_index.upsert(after)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member:discord.Member):
+        guild_index.bump_members(member.guild.id, 1)
+
+    @commands.Cog.listener()
+    async def on_raw_member_remove(self, payload:discord.RawMemberRemoveEvent):
+        guild_index.bump_members(payload.guild_id, -1)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel:discord.abc.GuildChannel):
+        if invite_cache.get(channel.guild.id, {}).get("channel") == channel.id:
+            invite_cache.pop(channel.guild.id, None)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild:discord.Guild):
+        guild_index.remove(guild.id)
+        invite_cache.pop(guild.id, None)
+
+    # ---- Admin Controls (owner & pookie have highest power) ----
+    @app_commands.command(name="add_admin", description="Owner/Pookie: add an admin.")
+    @app_cmd_check_pookie_or_owner()
+    @app_commands.describe(user="User to make admin")
+    async def slash_add_admin(self, inter:discord.Interaction, user:discord.User):
+        _set_member("admins", user.id, True)
+        await inter.response.send_message(f"Added **{user}** as admin.")
+
+    @app_commands.command(name="remove_admin", description="Owner/Pookie: remove an admin.")
+    @app_cmd_check_pookie_or_owner()
+    @app_commands.describe(user="User to remove from admins")
+    async def slash_remove_admin(self, inter:discord.Interaction, user:discord.User):
+        _set_member("admins", user.id, False)
+        await inter.response.send_message(f"Removed **{user}** from admins.")
+
+    @app_commands.command(name="show_admins", description="List all admins.")
+    @app_cmd_check_pookie_or_owner()
+    async def slash_show_admins(self, inter:discord.Interaction):
+        admins = [f"<@{i}>" for i in data.get("admins", [])]
+        await inter.response.send_message("Admins:\n" + ("\n".join(admins) if admins else "None"))
+
+    # ---- Pookie ----
+    @app_commands.command(name="add_pookie", description="Owner only: add a Pookie (highest power).")
+    @app_cmd_check_pookie_or_owner()
+    @app_commands.describe(user="User to make Pookie")
+    async def slash_add_pookie(self, inter:discord.Interaction, user:discord.User):
+        if not is_owner(inter.user):
+            await inter.response.send_message("Only the owner can add/remove Pookies.", ephemeral=True)
+            return
+        _set_member("pookies", user.id, True)
+        await inter.response.send_message(f"Added **{user}** as Pookie 👑")
+
+    @app_commands.command(name="remove_pookie", description="Owner only: remove a Pookie.")
+    @app_cmd_check_pookie_or_owner()
+    @app_commands.describe(user="User to remove from Pookies")
+    async def slash_remove_pookie(self, inter:discord.Interaction, user:discord.User):
+        if not is_owner(inter.user):
+            await inter.response.send_message("Only the owner can add/remove Pookies.", ephemeral=True)
+            return
+        _set_member("pookies", user.id, False)
+        await inter.response.send_message(f"Removed **{user}** from Pookies.")
+
+    @app_commands.command(name="list_pookies", description="List Pookie users.")
+    @app_cmd_check_blacklist()
+    async def slash_list_pookies(self, inter:discord.Interaction):
+        arr = [f"<@{i}>" for i in data.get("pookies", [])]
+        await inter.response.send_message("Pookies:\n" + ("\n".join(arr) if arr else "None"))
+
+    # ---- Trusted ----
+    @app_commands.command(name="add_trusted", description="Owner/Pookie: add a trusted user (bypass automod).")
+    @app_cmd_check_pookie_or_owner()
+    @app_commands.describe(user="User to add as trusted")
+    async def slash_add_trusted(self, inter:discord.Interaction, user:discord.User):
+        _set_member("trusted", user.id, True)
+        await inter.response.send_message(f"Added **{user}** as trusted.")
+
+    @app_commands.command(name="remove_trusted", description="Owner/Pookie: remove trusted user.")
+    @app_cmd_check_pookie_or_owner()
+    @app_commands.describe(user="User to remove")
+    async def slash_remove_trusted(self, inter:discord.Interaction, user:discord.User):
+        _set_member("trusted", user.id, False)
+        await inter.response.send_message(f"Removed **{user}** from trusted.")
+
+    @app_commands.command(name="list_trusted", description="List trusted users.")
+    @app_cmd_check_blacklist()
+    async def slash_list_trusted(self, inter:discord.Interaction):
+        arr = [f"<@{i}>" for i in data.get("trusted", [])]
+        await inter.response.send_message("Trusted:\n" + ("\n".join(arr) if arr else "None"))
+
+    # ---- Blacklist ----
+    @app_commands.command(name="blacklist", description="Admin: add a user to blacklist.")
+    @app_cmd_check_admin()
+    @app_commands.describe(user="User to blacklist")
+    async def slash_blacklist(self, inter:discord.Interaction, user:discord.User):
+        _set_member("blacklist", user.id, True)
+        await inter.response.send_message(f"Blacklisted **{user}**.")
+
+    @app_commands.command(name="unblacklist", description="Admin: remove a user from blacklist.")
+    @app_cmd_check_admin()
+    @app_commands.describe(user="User to unblacklist")
+    async def slash_unblacklist(self, inter:discord.Interaction, user:discord.User):
+        _set_member("blacklist", user.id, False)
+        await inter.response.send_message(f"Un-blacklisted **{user}**.")
+
+    # ---- Servers list & info ----
+    @app_commands.command(name="servers", description="List servers the bot is in.")
+    @app_cmd_check_pookie_or_owner()
+    @app_commands.describe(sort="Order (default: member count)", search="Filter by name or ID (substring)")
+    @app_commands.choices(sort=[app_commands.Choice(name=k, value=k) for k in SORTS])
+    async def slash_servers(self, inter:discord.Interaction, sort:app_commands.Choice[str]=None, search:str=None):
+        if not guild_index.built:
+            guild_index.rebuild(self.bot.guilds)
+        rows = guild_index.query(sort.value if sort else "members", search or "")
+        header = "\n".join([f"**{len(guild_index)} servers** across {self.bot.shard_count or 1} shard(s)"
+                            + (f", {len(rows)} matching `{search}`" if search else "")] + shard_lines())[:1500]
+        v = ServersView(inter.user.id, rows, header)
+        await inter.response.send_message(embed=v.build_embed(), view=v, ephemeral=True)
+
+    @app_commands.command(name="serverinfo", description="Show info about a server (by ID or current).")
+    @app_cmd_check_admin()
+    @app_commands.describe(guild_id="Optional server ID (defaults to current)")
+    async def slash_serverinfo(self, inter:discord.Interaction, guild_id:str=None):
+        g = inter.guild if not guild_id else self.bot.get_guild(int(guild_id))
+        if not g:
+            await inter.response.send_message("Guild not found or bot not in it.", ephemeral=True)
+            return
+        e = AM(0x2B2D31, f"Server Info - {g.name}")
+        e.add_field(name="ID", value=str(g.id))
+        e.add_field(name="Owner", value=f"{g.owner} ({g.owner_id})" if g.owner_id else "Unknown")
+        e.add_field(name="Members", value=str(g.member_count))
+        e.add_field(name="Channels", value=f"{len(g.text_channels)} text / {len(g.voice_channels)} voice / {len(g.categories)} categories")
+        e.add_field(name="Created", value=f"<t:{int(g.created_at.timestamp())}:F>")
+        # invite: skip straight to the answer if we know none can be made; defer only when asking Discord
+        inv = None
+        if not invite_impossible(g):
+            await inter.response.defer(ephemeral=True)
+            inv = await make_invite(g, inter.user)
+        if inv:
+            e.add_field(name="Invite (single use, 5m)", value=str(inv))
+        send = inter.followup.send if inter.response.is_done() else inter.response.send_message
+        await send(embed=e, ephemeral=True)
+
+    # ---- Restart Render Service ----
+    @app_commands.command(name="restart_service", description="Owner/Pookie: trigger a new deploy on Render.")
+    @app_cmd_check_pookie_or_owner()
+    async def slash_restart_service(self, inter:discord.Interaction):
+        if not (RENDER_API_KEY and RENDER_SERVICE_ID):
+            await inter.response.send_message("Missing RENDER_API_KEY or RENDER_SERVICE_ID.", ephemeral=True)
+            return
+        await inter.response.defer(ephemeral=True)
+        url = f"https://api.render.com/v1/services/{RENDER_SERVICE_ID}/deploys"
+        headers = {"Authorization": f"Bearer {RENDER_API_KEY}", "Content-Type": "application/json"}
+        try:
+            async with aiohttp.ClientSession() as s:
+                async with s.post(url, headers=headers, json={"clearCache":True}) as r:
+                    txt = await r.text()
+            await inter.followup.send(f"Triggered deploy on Render.\nResponse: `{txt[:1800]}`", ephemeral=True)
+        except Exception as e:
+            await inter.followup.send(f"Failed: {e}", ephemeral=True)
+
+    # ---- Debug / uptime ----
+    @app_commands.command(name="debug", description="Show uptime, system info, guilds.")
+    @app_cmd_check_admin()
+    async def slash_debug(self, inter:discord.Interaction):
+        import psutil
+        proc = psutil.Process(os.getpid())
+        mem = proc.memory_info().rss / (1024**2)
+        cpu = psutil.cpu_percent(interval=0.3)
+        up = human_timedelta(time.time() - start_time)
+        gcount = len(self.bot.guilds)
+        e = AM(0x57F287, "Debug")
+        e.add_field(name="Uptime", value=up)
+        e.add_field(name="Guilds", value=str(gcount))
+        e.add_field(name="CPU%", value=str(cpu))
+        e.add_field(name="RAM(MB)", value=f"{mem:.1f}")
+        e.add_field(name="Python", value=platform.python_version())
+        e.add_field(name="discord.py", value=discord.__version__)
+        if CLUSTER_COUNT > 1:
+            e.add_field(name="Cluster", value=f"{CLUSTER_ID+1}/{CLUSTER_COUNT} (shards {SHARD_IDS[0]}-{SHARD_IDS[-1]}), state v{core.shared.version}")
+        e.add_field(name=f"Shards ({'auto-sharded' if SHARDED else 'single'})", value="\n".join(shard_lines())[:1024], inline=False)
+        if startup_profile:
+            sp = startup_profile
+            e.add_field(name="Startup", value=f"ready in {sp['ready_secs']:.1f}s, {sp['rss_mb']:.0f} MB RSS, {sp['cached_members']} members\n{sp['profile']}\n{sp['stages']}"[:1024], inline=False)
+        e.add_field(name="Content cache", value=f"{len(content_cache)} msgs / {content_cache.bytes/1024**2:.1f} MB")
+        e.add_field(name="User / member lookups", value="\n".join(resolver_lines()), inline=False)
+        q = scheduler.metrics()
+        e.add_field(name="Outbound queue (depth / done / shed)", value="\n".join(f"{k}: {v['depth']} / {v['done']} / {v['shed']}" for k, v in q.items()), inline=False)
+        ns = normalizer_stats()
+        e.add_field(name="Automod normalizer", value=f"{ns['calls']} calls, {ns['hit_rate']*100:.1f}% cached, {ns['msgs_per_sec']:.0f} msg/s uncached", inline=False)
+        await inter.response.send_message(embed=e, ephemeral=True)
+
+    @app_commands.command(name="command_stats", description="Slowest slash commands (time to first response).")
+    @app_cmd_check_admin()
+    async def slash_command_stats(self, inter:discord.Interaction):
+        rows = slowest(15)
+        if not rows:
+            await inter.response.send_message("No commands timed yet.", ephemeral=True)
+            return
+        lines = [f"`/{name}` — p50 {st.pct(0.5)*1000:.0f} ms, p95 {st.p95*1000:.0f} ms, max {max(st.samples)*1000:.0f} ms"
+                 f" ({st.calls} calls, {st.auto_deferred} auto-deferred, {st.late} over {DEADLINE:.0f}s)" for name, st in rows]
+        await inter.response.send_message(embed=AM(0x57F287, "Slowest commands", "\n".join(lines)[:4000]), ephemeral=True)
+
+    # ---- Command tree sync ----
+    @app_commands.command(name="sync", description="Owner: force a command tree sync.")
+    @app_cmd_check_pookie_or_owner()
+    @app_commands.describe(scope="Where to sync")
+    @app_commands.choices(scope=[
+        app_commands.Choice(name="global", value="global"),
+        app_commands.Choice(name="this server", value="guild")
+    ])
+    async def slash_sync(self, inter:discord.Interaction, scope:app_commands.Choice[str]=None):
+        if not is_owner(inter.user):
+            await inter.response.send_message("Only the owner can sync commands.", ephemeral=True)
+            return
+        await inter.response.defer(ephemeral=True)
+        guild = inter.guild if scope and scope.value == "guild" else None
+        try:
+            await sync_tree(force=True, guild=guild)
+            await inter.followup.send(f"Synced {'to this server' if guild else 'globally'}.", ephemeral=True)
+        except Exception as e:
+            await inter.followup.send(f"Failed: {e}", ephemeral=True)
+
+    # ---- Hot reload ----
+    @app_commands.command(name="reload", description="Owner: reload extensions and re-read saved state (no restart).")
+    @app_cmd_check_pookie_or_owner()
+    @app_commands.describe(extensions="Comma-separated extension names, or 'all'", state="Also re-read saved data")
+    async def slash_reload(self, inter:discord.Interaction, extensions:str="all", state:bool=True):
+        if not is_owner(inter.user):
+            await inter.response.send_message("Only the owner can reload.", ephemeral=True)
+            return
+        await inter.response.defer(ephemeral=True)
+        lines = await reload_extensions(self.bot, extensions, state)
+        # this process only; other cluster processes keep their code until they restart
+        await inter.followup.send("\n".join(lines)[:1900], ephemeral=True)
+
+    @slash_reload.autocomplete("extensions")
+    async def reload_autocomplete(self, inter:discord.Interaction, current:str):
+        names = ["all"] + sorted(self.bot.extensions)
+        return [app_commands.Choice(name=n, value=n) for n in names if current.lower() in n][:25]
+
+    @commands.command(name="reload")
+    async def pc_reload(self, ctx:commands.Context, *, extensions:str="all"):
+        if not is_owner(ctx.author):
+            return
+        lines = await reload_extensions(self.bot, extensions, True)
+        await ctx.reply("\n".join(lines)[:1900])
+
+    @commands.command(name="sync")
+    async def pc_sync(self, ctx:commands.Context, scope:str="global"):
+        if not is_owner(ctx.author):
+            return
+        guild = ctx.guild if scope == "guild" else None
+        try:
+            await sync_tree(force=True, guild=guild)
+            await ctx.reply(f"Synced {'to this server' if guild else 'globally'}.")
+        except Exception as e:
+            await ctx.reply(f"Failed: {e}")
+
+async def setup(bot):
+    await bot.add_cog(Admin(bot))
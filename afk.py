@@ -1,41 +1,82 @@
+import os
+import time
 import discord
 from discord.ext import commands
-from datetime import datetime
+
+from content_scan import scan_message
+from outbound import scheduler, REPLY
+from core import data, save_data, afk_map, afk_ids
+
+AFK_EXPIRE_HOURS = float(os.getenv("AFK_EXPIRE_HOURS", "0") or 0)   # 0 = AFK never expires on its own
+AFK_NOTICE_COOLDOWN = 15   # seconds between AFK notices in the same channel
 
 class AFK(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.afk_users = {}  # {user_id: {"reason": str, "since": datetime}}
+        self.last_notice = {}   # channel_id -> time of the last AFK notice
+
+    def drop_expired(self, uids):
+        # lazy expiry: entries are only checked when they would be shown
+        now = time.time()
+        afk = afk_map()
+        gone = [u for u in uids if (afk[str(u)].get("expires") or now + 1) <= now]
+        for u in gone:
+            afk.pop(str(u), None)
+        if gone:
+            save_data(data)
+        return uids - set(gone)
+
+    def channel_ready(self, channel_id: int) -> bool:
+        now = time.monotonic()
+        if now - self.last_notice.get(channel_id, 0) < AFK_NOTICE_COOLDOWN:
+            return False
+        if len(self.last_notice) > 1000:
+            self.last_notice = {c: t for c, t in self.last_notice.items() if now - t < AFK_NOTICE_COOLDOWN}
+        self.last_notice[channel_id] = now
+        return True
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
         if message.author.bot:
             return
+        ids = afk_ids()
+        if not ids:
+            return
 
         # If AFK user sends a message -> remove AFK
-        if message.author.id in self.afk_users:
-            data = self.afk_users.pop(message.author.id)
-            since = data["since"].strftime("%H:%M:%S")
-            await message.channel.send(
-                f"👋 Welcome back {message.author.mention}, I removed your AFK (since {since})."
-            )
-
-        # If someone mentions an AFK user
-        if message.mentions:
-            for user in message.mentions:
-                if user.id in self.afk_users:
-                    data = self.afk_users[user.id]
-                    reason = data['reason']
-                    since = data['since'].strftime("%H:%M:%S")
-                    await message.channel.send(
-                        f"💤 {user.display_name} is AFK (since {since}): {reason}"
-                    )
+        if message.author.id in ids:
+            entry = afk_map().pop(str(message.author.id))
+            save_data(data)
+            if not entry.get("expires") or entry["expires"] > time.time():
+                scheduler.fire(REPLY, ("ch", message.channel.id), lambda: message.channel.send(
+                    f"👋 Welcome back {message.author.mention}, I removed your AFK (set <t:{entry['since']}:R>)."
+                ), guild=message.guild and message.guild.id)
+            ids = afk_ids()
+
+        # If someone mentions AFK users (mention IDs come from the shared scan): one combined notice
+        hits = scan_message(message).mentions & ids
+        if hits:
+            hits = self.drop_expired(hits)
+        if not hits or not self.channel_ready(message.channel.id):
+            return
+        afk = afk_map()
+        names = {u.id: u.display_name for u in message.mentions}
+        lines = [f"💤 {names.get(u, f'<@{u}>')} is AFK (since <t:{afk[str(u)]['since']}:R>): {afk[str(u)]['reason']}"
+                 for u in sorted(hits)]
+        text = "\n".join(lines)[:2000]
+        scheduler.fire(REPLY, ("ch", message.channel.id), lambda: message.reply(
+            text, mention_author=False, allowed_mentions=discord.AllowedMentions.none()), guild=message.guild and message.guild.id)
 
     @commands.hybrid_command(name="afk", description="Set yourself as AFK with an optional reason.")
     async def afk(self, ctx: commands.Context, *, reason: str = "AFK"):
         """Slash + Prefix command to go AFK"""
-        self.afk_users[ctx.author.id] = {"reason": reason, "since": datetime.now()}
-        await ctx.send(f"✅ {ctx.author.mention}, I set your AFK: {reason}")
+        now = int(time.time())
+        afk_map()[str(ctx.author.id)] = {
+            "reason": reason[:300], "since": now,
+            "expires": now + int(AFK_EXPIRE_HOURS * 3600) if AFK_EXPIRE_HOURS else None,
+        }
+        save_data(data)
+        await ctx.send(f"✅ {ctx.author.mention}, I set your AFK: {reason}", allowed_mentions=discord.AllowedMentions(users=[ctx.author]))
 
 async def setup(bot):
     await bot.add_cog(AFK(bot))
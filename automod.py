@@ -0,0 +1,315 @@
+# =========================
+# automod.py
+# =========================
+# Invite / link / blocked-word / regex / spam / near-duplicate filters and their config commands.
+import time, asyncio
+from collections import defaultdict
+from datetime import timedelta
+
+import discord
+from discord.ext import commands
+from discord import app_commands
+
+from content_scan import scan_message, MessageScan
+from fingerprints import simhash, dupe_index
+import regex_sandbox
+from outbound import scheduler, MOD
+from core import (data, save_data, AM, send_log, purge_scope, is_trusted, regex_rules_map, recent_msgs, add_warn,
+                  app_cmd_check_admin, app_cmd_check_blacklist, SPAM_WINDOW, SPAM_THRESHOLD, DEFAULT_TIMEOUT_SECS, DUPE_WINDOW,
+                  DUPE_THRESHOLD, DUPE_MIN_LENGTH)
+
+ACTIONS = ["delete", "warn", "timeout"]
+
+async def apply_action(message:discord.Message, action:str, duration:int|None, reason:str):
+    if action == "delete":
+        try:
+            await scheduler.run(MOD, ("ch", message.channel.id), lambda: message.delete(), guild=message.guild.id)
+        except: pass
+    elif action == "timeout":
+        try:
+            secs = duration or DEFAULT_TIMEOUT_SECS
+            until = discord.utils.utcnow() + timedelta(seconds=secs)
+            await scheduler.run(MOD, ("guild", message.guild.id), lambda: message.author.timeout(until, reason=reason))
+        except: pass
+    elif action == "warn":
+        # counts toward the guild's warn escalation like a manual /warn
+        try:
+            await add_warn(message.guild, message.author, reason, message.guild.me.id)
+        except: pass
+
+async def purge_burst(guild:discord.Guild, burst:list[tuple]):
+    # one bulk_delete per channel for the messages that made up a spam burst; the automod
+    # action entry is the only log for it, so the delete events are kept out of the bulk delete log
+    by_channel = defaultdict(list)
+    for _, mid, cid in burst:
+        by_channel[cid].append(mid)
+    async def clean(cid:int, ids:list[int]):
+        ch = guild.get_channel_or_thread(cid)
+        if not ch: return
+        ids = ids[-100:]
+        async with purge_scope(ch, log=False) as scope:
+            scope.claim(ids)
+            try:
+                if len(ids) == 1:
+                    await scheduler.run(MOD, ("ch", cid), lambda: ch.get_partial_message(ids[0]).delete(), guild=guild.id)
+                else:
+                    objs = [discord.Object(id=i) for i in ids]
+                    await scheduler.run(MOD, ("ch", cid), lambda: ch.delete_messages(objs, reason="Automod: spam burst"), guild=guild.id)
+            except: pass
+    await asyncio.gather(*(clean(cid, ids) for cid, ids in by_channel.items()))
+
+def automod_cfg():
+    return data.get("automod", {
+        "enabled": True,
+        "anti_link": {"enabled": True, "action": "delete"},
+        "anti_invite": {"enabled": True, "action": "delete"},
+        "blocked_words": {"enabled": True, "action": "delete"},
+        "anti_spam": {"enabled": True, "window": SPAM_WINDOW, "threshold": SPAM_THRESHOLD, "action": "timeout", "duration": DEFAULT_TIMEOUT_SECS},
+        "anti_dupe": {"enabled": False, "window": DUPE_WINDOW, "threshold": DUPE_THRESHOLD, "action": "delete"},
+        "trusted_bypass": True
+    })
+
+async def handle_automod(message:discord.Message, scan:MessageScan):
+    if message.author.bot or not message.guild:
+        return
+    cfg = automod_cfg()
+    if not cfg.get("enabled", True):
+        return
+    if cfg.get("trusted_bypass", True) and is_trusted(message.author):
+        return
+
+    reason = None
+    action_to_apply = None
+    duration = None
+
+    # anti-invite
+    if cfg["anti_invite"]["enabled"] and scan.has_invite:
+        action_to_apply = cfg["anti_invite"]["action"]
+        reason = "Automod: Discord invite link"
+    # anti-link
+    elif cfg["anti_link"]["enabled"] and scan.has_link:
+        action_to_apply = cfg["anti_link"]["action"]
+        reason = "Automod: Link detected"
+    # blocked words
+    elif cfg["blocked_words"]["enabled"] and data.get("blocked_words"):
+        w = scan.first_blocked(data["blocked_words"])
+        if w:
+            action_to_apply = cfg["blocked_words"]["action"]
+            reason = f"Automod: Blocked word ({w})"
+    # admin regex rules (evaluated off-loop, with a time budget)
+    rules = data.get("regex_rules", {}).get(str(message.guild.id))
+    if not action_to_apply and rules and message.content:
+        rule, slow = await regex_sandbox.evaluate(rules, message.content)
+        if rule:
+            action_to_apply = rule.get("action", "delete")
+            reason = f"Automod: Regex rule (`{rule['pattern'][:100]}`)"
+        if slow:
+            await strike_regex_rules(message.guild, slow)
+    # anti-spam
+    burst = None
+    if not action_to_apply and cfg["anti_spam"]["enabled"]:
+        rm = recent_msgs[message.guild.id][message.author.id]
+        now = time.time()
+        rm.append((now, message.id, message.channel.id))
+        window = cfg["anti_spam"].get("window", SPAM_WINDOW)
+        thresh = cfg["anti_spam"].get("threshold", SPAM_THRESHOLD)
+        while rm and now - rm[0][0] > window:
+            rm.popleft()
+        if len(rm) >= thresh:
+            action_to_apply = cfg["anti_spam"].get("action", "timeout")
+            duration = cfg["anti_spam"].get("duration", DEFAULT_TIMEOUT_SECS)
+            reason = f"Automod: Spam (>{thresh} msgs/{window}s)"
+            burst = list(rm)
+            rm.clear()
+    # near-duplicate content across users / channels
+    dupe = cfg.get("anti_dupe", {})
+    if not action_to_apply and dupe.get("enabled", False):
+        # raw word tokens: punctuation is already dropped, and the confusable fold would turn "!" into a letter
+        words = [t[2] for t in scan.tokens]
+        if sum(map(len, words)) >= DUPE_MIN_LENGTH:
+            now = time.time()
+            window = dupe.get("window", DUPE_WINDOW)
+            thresh = dupe.get("threshold", DUPE_THRESHOLD)
+            fp = simhash(words)
+            idx = dupe_index[message.guild.id]
+            matches = idx.add(now, fp, message.id, message.channel.id, message.author.id, window)
+            if len(matches) + 1 >= thresh:
+                users = {m[4] for m in matches} | {message.author.id}
+                chans = {m[3] for m in matches} | {message.channel.id}
+                action_to_apply = dupe.get("action", "delete")
+                duration = dupe.get("duration", DEFAULT_TIMEOUT_SECS) if action_to_apply == "timeout" else None
+                reason = f"Automod: Repeated content ({len(matches)+1} copies/{window}s, {len(users)} users, {len(chans)} channels)"
+                burst = [(m[0], m[2], m[3]) for m in matches if m[2] not in idx.removed] + [(now, message.id, message.channel.id)]
+                idx.mark_removed(b[1] for b in burst)
+
+    if action_to_apply:
+        e = AM(0xAA00AA, "Automod Action")
+        e.add_field(name="User", value=f"{message.author} ({message.author.id})", inline=False)
+        e.add_field(name="Channel", value=message.channel.mention, inline=True)
+        e.add_field(name="Action", value=action_to_apply + (f" ({duration}s)" if duration else ""), inline=True)
+        e.add_field(name="Reason", value=reason or "Automod", inline=False)
+        if message.content:
+            e.add_field(name="Content", value=message.content[:800], inline=False)
+        # timeout / cleanup / log run concurrently; a spam burst is one bulk delete + one log entry
+        jobs = []
+        if burst:
+            e.add_field(name="Burst removed", value=f"{len(burst)} messages in {len({b[2] for b in burst})} channel(s)", inline=True)
+            jobs.append(purge_burst(message.guild, burst))
+        if not (burst and action_to_apply == "delete"):
+            jobs.append(apply_action(message, action_to_apply, duration, reason))
+        jobs.append(send_log(message.guild, e))
+        await asyncio.gather(*jobs)
+
+async def strike_regex_rules(guild:discord.Guild, slow:list[dict]):
+    disabled = []
+    for r in slow:
+        r["strikes"] = r.get("strikes", 0) + 1
+        if r["strikes"] >= regex_sandbox.MAX_STRIKES and r.get("enabled", True):
+            r["enabled"] = False
+            disabled.append(r)
+    save_data(data)
+    for r in disabled:
+        e = AM(0xFF8800, "Regex Rule Disabled")
+        e.add_field(name="Pattern", value=f"`{r['pattern'][:1000]}`", inline=False)
+        e.add_field(name="Reason", value=f"Timed out {r['strikes']} times (>{regex_sandbox.TIME_BUDGET}s)", inline=False)
+        await send_log(guild, e)
+
+class Automod(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.Cog.listener()
+    async def on_message(self, message:discord.Message):
+        if message.guild and not message.author.bot:
+            await handle_automod(message, scan_message(message))
+
+    # ---- Blocked words ----
+    @app_commands.command(name="add_blocked_word", description="Admin: add a blocked word.")
+    @app_cmd_check_admin()
+    @app_commands.describe(word="Word to block")
+    async def slash_add_blocked(self, inter:discord.Interaction, word:str):
+        arr = set(data.get("blocked_words", []))
+        arr.add(word.lower())
+        data["blocked_words"] = list(arr)
+        save_data(data)
+        await inter.response.send_message(f"Added blocked word: `{word}`")
+
+    @app_commands.command(name="remove_blocked_word", description="Admin: remove a blocked word.")
+    @app_cmd_check_admin()
+    @app_commands.describe(word="Word to remove")
+    async def slash_remove_blocked(self, inter:discord.Interaction, word:str):
+        arr = set(data.get("blocked_words", []))
+        arr.discard(word.lower())
+        data["blocked_words"] = list(arr)
+        save_data(data)
+        await inter.response.send_message(f"Removed blocked word: `{word}`")
+
+    @app_commands.command(name="show_blocked_words", description="List blocked words.")
+    @app_cmd_check_blacklist()
+    async def slash_show_blocked(self, inter:discord.Interaction):
+        arr = data.get("blocked_words", [])
+        await inter.response.send_message("Blocked words:\n" + (", ".join(arr) if arr else "None"))
+
+    # ---- Automod Config ----
+    @app_commands.command(name="automod", description="Configure automod.")
+    @app_cmd_check_admin()
+    @app_commands.describe(rule="Which rule", enabled="Enable/disable", action="Action", window="Spam/dupe window (s)", threshold="Spam msgs / dupe copies", duration="Timeout seconds")
+    @app_commands.choices(rule=[
+        app_commands.Choice(name="anti_link", value="anti_link"),
+        app_commands.Choice(name="anti_invite", value="anti_invite"),
+        app_commands.Choice(name="blocked_words", value="blocked_words"),
+        app_commands.Choice(name="anti_spam", value="anti_spam"),
+        app_commands.Choice(name="anti_dupe", value="anti_dupe"),
+        app_commands.Choice(name="toggle_all", value="toggle_all")
+    ])
+    @app_commands.choices(action=[
+        app_commands.Choice(name="delete", value="delete"),
+        app_commands.Choice(name="warn", value="warn"),
+        app_commands.Choice(name="timeout", value="timeout")
+    ])
+    async def slash_automod(self, inter:discord.Interaction, rule:app_commands.Choice[str], enabled:bool=None, action:app_commands.Choice[str]=None, window:int=None, threshold:int=None, duration:int=None):
+        cfg = automod_cfg()
+        r = rule.value
+        if r == "toggle_all":
+            if enabled is None:
+                await inter.response.send_message("Provide enabled=true/false for toggle_all.", ephemeral=True)
+                return
+            cfg["enabled"] = enabled
+            data["automod"] = cfg; save_data(data)
+            await inter.response.send_message(f"Automod enabled = **{enabled}**")
+            return
+
+        cfg.setdefault(r, {})
+        if enabled is not None:
+            cfg[r]["enabled"] = enabled
+        if action is not None:
+            cfg[r]["action"] = action.value
+        if r in ("anti_spam", "anti_dupe"):
+            if window is not None: cfg[r]["window"] = max(2, int(window))
+            if threshold is not None: cfg[r]["threshold"] = max(2, int(threshold))
+            if duration is not None: cfg[r]["duration"] = max(5, int(duration))
+        data["automod"] = cfg
+        save_data(data)
+        await inter.response.send_message(f"Automod updated: `{r}` -> {cfg[r]}")
+
+    # ---- Regex rules ----
+    @app_commands.command(name="regex_rule_add", description="Admin: add a custom automod regex rule.")
+    @app_cmd_check_admin()
+    @app_commands.describe(pattern="Regex (case-insensitive)", action="Action on match")
+    @app_commands.choices(action=[
+        app_commands.Choice(name="delete", value="delete"),
+        app_commands.Choice(name="warn", value="warn"),
+        app_commands.Choice(name="timeout", value="timeout")
+    ])
+    async def slash_regex_rule_add(self, inter:discord.Interaction, pattern:str, action:app_commands.Choice[str]=None):
+        rules = regex_rules_map(inter.guild.id)
+        if len(rules) >= regex_sandbox.MAX_RULES:
+            await inter.response.send_message(f"Max {regex_sandbox.MAX_RULES} regex rules per server.", ephemeral=True)
+            return
+        await inter.response.defer(ephemeral=True)
+        err = await regex_sandbox.validate_pattern(pattern)
+        if err:
+            await inter.followup.send(f"Rejected: {err}", ephemeral=True)
+            return
+        rules.append({"pattern": pattern, "action": action.value if action else "delete", "enabled": True, "strikes": 0})
+        save_data(data)
+        await inter.followup.send(f"Added regex rule #{len(rules)}: `{pattern}`", ephemeral=True)
+
+    @app_commands.command(name="regex_rule_remove", description="Admin: remove a regex rule by index.")
+    @app_cmd_check_admin()
+    @app_commands.describe(index="Rule number (1..N)")
+    async def slash_regex_rule_remove(self, inter:discord.Interaction, index:int):
+        rules = regex_rules_map(inter.guild.id)
+        if 1 <= index <= len(rules):
+            r = rules.pop(index-1)
+            save_data(data)
+            await inter.response.send_message(f"Removed regex rule `{r['pattern']}`")
+        else:
+            await inter.response.send_message("Invalid index.", ephemeral=True)
+
+    @app_commands.command(name="regex_rule_toggle", description="Admin: enable/disable a regex rule (re-enabling clears strikes).")
+    @app_cmd_check_admin()
+    @app_commands.describe(index="Rule number (1..N)", enabled="Enable/disable")
+    async def slash_regex_rule_toggle(self, inter:discord.Interaction, index:int, enabled:bool):
+        rules = regex_rules_map(inter.guild.id)
+        if not 1 <= index <= len(rules):
+            await inter.response.send_message("Invalid index.", ephemeral=True)
+            return
+        rules[index-1]["enabled"] = enabled
+        if enabled:
+            rules[index-1]["strikes"] = 0
+        save_data(data)
+        await inter.response.send_message(f"Regex rule #{index} enabled = **{enabled}**")
+
+    @app_commands.command(name="regex_rule_list", description="List custom regex rules.")
+    @app_cmd_check_admin()
+    async def slash_regex_rule_list(self, inter:discord.Interaction):
+        rules = regex_rules_map(inter.guild.id)
+        if not rules:
+            await inter.response.send_message("No regex rules set.", ephemeral=True)
+            return
+        desc = "\n".join(f"{i}. `{r['pattern']}` → {r.get('action','delete')}" + ("" if r.get("enabled", True) else f" (disabled, {r.get('strikes',0)} timeouts)") for i, r in enumerate(rules, 1))
+        await inter.response.send_message(embed=AM(0x5865F2, "Regex Rules", desc[:4000]), ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(Automod(bot))
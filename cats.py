@@ -0,0 +1,131 @@
+# =========================
+# cats.py
+# =========================
+# /cat plus the daily (11:00 local) and hourly cat posts.
+import os, asyncio, aiohttp
+from datetime import datetime
+
+import discord
+from discord.ext import commands, tasks
+from discord import app_commands
+import pytz
+
+from outbound import scheduler, CAT
+from core import data, save_data, hourly_cat_map, app_cmd_check_admin, app_cmd_check_blacklist
+
+CAT_API_KEY = os.getenv("CAT_API_KEY", "").strip()  # TheCatAPI (optional but recommended)
+TZ_NAME     = os.getenv("TZ", "Asia/Kolkata")
+IST_TZ      = pytz.timezone(TZ_NAME)
+
+async def fetch_cat_url(session:aiohttp.ClientSession):
+    # mostly images, occasionally videos
+    params = {"size": "med", "limit": 1}
+    url = "https://api.thecatapi.com/v1/images/search?mime_types=jpg,png,gif,mp4"
+    headers = {}
+    if CAT_API_KEY:
+        headers["x-api-key"] = CAT_API_KEY
+    async with session.get(url, headers=headers, params=params, timeout=20) as r:
+        if r.status == 200:
+            arr = await r.json()
+            if isinstance(arr, list) and arr:
+                item = arr[0]
+                return item.get("url")
+    return None
+
+class Cats(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        self.daily_cat_task.start()
+        self.hourly_cat_task.start()
+
+    async def cog_unload(self):
+        self.daily_cat_task.cancel()
+        self.hourly_cat_task.cancel()
+
+    @app_commands.command(name="cat", description="Send a random cat (image or video).")
+    @app_cmd_check_blacklist()
+    async def slash_cat(self, inter:discord.Interaction):
+        await inter.response.defer()
+        async with aiohttp.ClientSession() as s:
+            url = await fetch_cat_url(s)
+        if url:
+            await inter.followup.send(url)
+        else:
+            await inter.followup.send("Couldn't fetch a cat right now.")
+
+    @app_commands.command(name="set_daily_cat_channel", description="Admin: set the daily cat channel (11:00 IST).")
+    @app_cmd_check_admin()
+    @app_commands.describe(channel="Channel for daily cat")
+    async def slash_set_daily_cat(self, inter:discord.Interaction, channel:discord.TextChannel):
+        data.setdefault("cat_daily_channel", {})
+        data["cat_daily_channel"][str(inter.guild.id)] = channel.id
+        save_data(data)
+        await inter.response.send_message(f"Daily cats will go to {channel.mention} at 11:00 {TZ_NAME}.")
+
+    @app_commands.command(name="set_hourly_cat_channel", description="Admin: add this channel for hourly cats.")
+    @app_cmd_check_admin()
+    @app_commands.describe(channel="Channel for hourly cats")
+    async def slash_set_hourly_cat(self, inter:discord.Interaction, channel:discord.TextChannel):
+        arr = hourly_cat_map(inter.guild.id)
+        if channel.id not in arr:
+            arr.append(channel.id)
+            data["cat_hourly_channels"][str(inter.guild.id)] = arr
+            save_data(data)
+        await inter.response.send_message(f"Hourly cats enabled in {channel.mention}.")
+
+    @app_commands.command(name="stop_hourly_cat", description="Admin: stop hourly cats in this channel.")
+    @app_cmd_check_admin()
+    @app_commands.describe(channel="Channel to stop")
+    async def slash_stop_hourly_cat(self, inter:discord.Interaction, channel:discord.TextChannel):
+        arr = hourly_cat_map(inter.guild.id)
+        if channel.id in arr:
+            arr.remove(channel.id)
+            data["cat_hourly_channels"][str(inter.guild.id)] = arr
+            save_data(data)
+            await inter.response.send_message(f"Hourly cats disabled in {channel.mention}.")
+        else:
+            await inter.response.send_message("This channel is not set for hourly cats.", ephemeral=True)
+
+    # Schedulers
+    @tasks.loop(minutes=1)
+    async def daily_cat_task(self):
+        # runs each minute; posts near 11:00 IST
+        now_ist = datetime.now(IST_TZ)
+        if now_ist.hour == 11 and now_ist.minute == 0:
+            for gid_str, cid in data.get("cat_daily_channel", {}).items():
+                g = self.bot.get_guild(int(gid_str))
+                if not g: continue
+                ch = g.get_channel(cid)
+                if not ch: continue
+                try:
+                    async with aiohttp.ClientSession() as s:
+                        url = await fetch_cat_url(s)
+                    if url:
+                        scheduler.fire(CAT, ("ch", ch.id), lambda ch=ch, url=url: ch.send(f"🐱 Daily Cat ({TZ_NAME} 11:00):\n{url}"), guild=ch.guild.id)
+                except: pass
+            await asyncio.sleep(60)  # avoid double post within the same minute
+
+    @tasks.loop(hours=1)
+    async def hourly_cat_task(self):
+        for gid_str, arr in data.get("cat_hourly_channels", {}).items():
+            g = self.bot.get_guild(int(gid_str))
+            if not g: continue
+            for cid in list(arr):
+                ch = g.get_channel(cid)
+                if not ch: continue
+                try:
+                    async with aiohttp.ClientSession() as s:
+                        url = await fetch_cat_url(s)
+                    if url:
+                        scheduler.fire(CAT, ("ch", ch.id), lambda ch=ch, url=url: ch.send(f"🐾 Hourly Cat:\n{url}"), guild=ch.guild.id)
+                except: pass
+
+    @daily_cat_task.before_loop
+    @hourly_cat_task.before_loop
+    async def before_cat_tasks(self):
+        await self.bot.wait_until_ready()
+
+async def setup(bot):
+    await bot.add_cog(Cats(bot))
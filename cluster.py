@@ -0,0 +1,59 @@
+# =========================
+# cluster.py
+# =========================
+# Runs CLUSTER_COUNT copies of main.py, one per core, each owning a slice of
+# SHARD_COUNT shards. They share state through STATE_DB (see shared_state.py).
+#   SHARD_COUNT=8 CLUSTER_COUNT=4 python cluster.py
+import os, sys, math, signal, subprocess, time
+
+RESTART_DELAY = 5
+
+def spawn(i:int, count:int) -> subprocess.Popen:
+    env = dict(os.environ, CLUSTER_ID=str(i), CLUSTER_COUNT=str(count))
+    env.setdefault("STATE_DB", "state.db")
+    return subprocess.Popen([sys.executable, "main.py"], env=env)
+
+def check_layout(count:int, shards:int) -> str|None:
+    # same split as core.py; a bad layout would make every child raise at import and
+    # get restarted forever, so refuse it here before spawning anything
+    if count < 1 or shards < 1:
+        return "CLUSTER_COUNT and SHARD_COUNT must be positive"
+    if os.getenv("SHARD_IDS", "").strip():
+        return "SHARD_IDS can't be used with cluster.py (each cluster gets its slice of SHARD_COUNT)"
+    per = math.ceil(shards / count)
+    empty = [i for i in range(count) if i * per >= shards]
+    if empty:
+        return (f"CLUSTER_COUNT={count} is too many for SHARD_COUNT={shards}: cluster(s) {empty} would get no shards "
+                f"(use at most {math.ceil(shards / per)} clusters, or more shards)")
+    return None
+
+def main():
+    count = int(os.getenv("CLUSTER_COUNT", str(os.cpu_count() or 1)))
+    if not os.getenv("SHARD_COUNT"):
+        raise SystemExit("SHARD_COUNT must be set for cluster mode")
+    err = check_layout(count, int(os.getenv("SHARD_COUNT")))
+    if err:
+        raise SystemExit(f"Invalid cluster layout: {err}")
+    procs = [spawn(i, count) for i in range(count)]
+    stopping = False
+
+    def stop(*_):
+        nonlocal stopping
+        stopping = True
+        for p in procs:
+            p.terminate()
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while not stopping:
+        time.sleep(1)
+        for i, p in enumerate(procs):
+            if p.poll() is not None and not stopping:
+                print(f"cluster {i} exited with {p.returncode}; restarting in {RESTART_DELAY}s")
+                time.sleep(RESTART_DELAY)
+                procs[i] = spawn(i, count)
+    for p in procs:
+        p.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+# =========================
+# command_timing.py
+# =========================
+# Slash command latency tracking + auto-defer. `timed` wraps a command callback
+# and hands it a TimedInteraction, whose .response times the command's first
+# response and, if the 3s interaction deadline is close (or the command's recent
+# p95 says it will be), defers on the command's behalf and turns its later
+# send_message into a followup. Commands keep calling inter.response.* as before.
+# Only public discord.py API is used: the real interaction is never modified.
+import os, time, asyncio, functools
+from collections import defaultdict, deque
+
+import discord
+
+DEADLINE = 3.0            # seconds Discord allows before the first response
+AUTO_DEFER_AT = float(os.getenv("AUTO_DEFER_AT", "2.2"))   # defer if nothing was sent by then
+P95_DEFER = 1.8           # commands whose recent p95 is above this are deferred up front
+MIN_SAMPLES = 5           # before p95 is trusted
+SAMPLES_KEEP = 200        # per command
+
+class CommandStats:
+    def __init__(self):
+        self.samples: deque = deque(maxlen=SAMPLES_KEEP)   # seconds to the command's own first response
+        self.calls = 0
+        self.auto_deferred = 0
+        self.late = 0             # first response after DEADLINE (failed, or saved by an auto-defer)
+        self.ephemeral = None     # how the command answered last time (None = not seen yet); auto-defers copy it
+        self._sorted = None
+
+    def add(self, secs:float):
+        self.samples.append(secs)
+        self.calls += 1
+        self._sorted = None
+        if secs > DEADLINE:
+            self.late += 1
+
+    def pct(self, q:float) -> float:
+        if self._sorted is None:
+            self._sorted = sorted(self.samples)
+        s = self._sorted
+        return s[min(len(s)-1, int(q * len(s)))] if s else 0.0
+
+    @property
+    def p95(self) -> float:
+        return self.pct(0.95)
+
+command_stats: dict[str, CommandStats] = defaultdict(CommandStats)
+
+class TimedResponse:
+    # stands in for interaction.response inside a timed command; every way of
+    # responding goes through _own() first, so our deadline timer can't fire after it
+    def __init__(self, interaction:discord.Interaction, name:str, ephemeral:bool|None=None):
+        self._inter = interaction
+        self._inner = interaction.response
+        self.name = name
+        self.declared = ephemeral   # from @timed(ephemeral=...), beats what was learned
+        self.t0 = time.perf_counter()
+        self.started = False      # some response (ours or the command's) is under way
+        self.recorded = False
+        self.auto = None          # our defer task, once we deferred for the command
+        self.auto_ephemeral = True
+        st = command_stats[name]
+        if len(st.samples) >= MIN_SAMPLES and st.p95 >= P95_DEFER:
+            delay = 0.0
+        else:
+            # the deadline runs from Discord's timestamp, so time spent reaching us counts too
+            waited = (discord.utils.utcnow() - interaction.created_at).total_seconds()
+            delay = max(0.0, AUTO_DEFER_AT - max(0.0, waited))
+        self.timer = asyncio.get_running_loop().call_later(delay, self._deadline)
+
+    def __getattr__(self, attr):
+        return getattr(self._inner, attr)
+
+    def _deadline(self):
+        if self.started or self._inner.is_done():
+            return
+        self.started = True
+        st = command_stats[self.name]
+        st.auto_deferred += 1
+        # unknown -> private: a public "thinking..." would turn a private answer into a channel message
+        eph = self.declared if self.declared is not None else st.ephemeral
+        self.auto_ephemeral = eph is not False
+        self.auto = asyncio.ensure_future(self._inner.defer(ephemeral=self.auto_ephemeral, thinking=True))
+        self.auto.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+    def _own(self, ephemeral:bool|None=None):
+        # the command's own first response
+        self.started = True
+        self.timer.cancel()
+        if not self.recorded:
+            self.recorded = True
+            st = command_stats[self.name]
+            st.add(time.perf_counter() - self.t0)
+            if ephemeral is not None:
+                st.ephemeral = ephemeral   # learned even when we had to defer first
+
+    def finish(self):
+        # command returned (or failed); commands that only used followups are timed here
+        self.timer.cancel()
+        if not self.recorded and (self.started or self._inner.is_done()):
+            self._own()
+
+    def is_done(self) -> bool:
+        return self.auto is not None or self._inner.is_done()
+
+    async def defer(self, **kwargs):
+        self._own(kwargs.get("ephemeral", False))
+        if self.auto:
+            await self.auto
+            return
+        return await self._inner.defer(**kwargs)
+
+    async def followup(self, *args, **kwargs):
+        # answer after our auto-defer; the first followup fills the "thinking..." message and takes
+        # its visibility, so when that doesn't match, drop it and send a fresh message instead
+        await self.auto
+        kwargs.pop("delete_after", None)
+        if kwargs.get("ephemeral", False) != self.auto_ephemeral:
+            try:
+                await self._inter.delete_original_response()
+            except discord.HTTPException: pass
+        return await self._inter.followup.send(*args, **kwargs)
+
+    async def send_message(self, *args, **kwargs):
+        self._own(kwargs.get("ephemeral", False))
+        if self.auto:
+            return await self.followup(*args, **kwargs)
+        return await self._inner.send_message(*args, **kwargs)
+
+    async def edit_message(self, **kwargs):
+        self._own()
+        if self.auto:
+            await self.auto
+            kwargs.pop("delete_after", None)
+            return await self._inter.edit_original_response(**kwargs)
+        return await self._inner.edit_message(**kwargs)
+
+    async def send_modal(self, modal:discord.ui.Modal):
+        self._own()
+        if self.auto:
+            raise discord.InteractionResponded(self._inter)   # a modal can't follow a defer
+        return await self._inner.send_modal(modal)
+
+class TimedInteraction:
+    # the real interaction with .response swapped for a TimedResponse; everything else passes through
+    def __init__(self, interaction:discord.Interaction, name:str, ephemeral:bool|None=None):
+        self._inter = interaction
+        self.response = TimedResponse(interaction, name, ephemeral)
+
+    def __getattr__(self, attr):
+        return getattr(self._inter, attr)
+
+def timed(func=None, *, ephemeral:bool|None=None):
+    # wraps a slash command callback (cog method: self, interaction, ...); @timed or
+    # @timed(ephemeral=True) to say up front how an auto-defer should look for this command
+    if func is None:
+        return lambda f: timed(f, ephemeral=ephemeral)
+    @functools.wraps(func)
+    async def wrapper(self, interaction:discord.Interaction, *args, **kwargs):
+        name = interaction.command.qualified_name if interaction.command else func.__name__
+        inter = TimedInteraction(interaction, name, ephemeral)
+        try:
+            return await func(self, inter, *args, **kwargs)
+        except BaseException:
+            resp = inter.response
+            if resp.auto and not resp.recorded:
+                # we left a "thinking..." on screen; don't leave it hanging
+                try:
+                    await resp.followup("Something went wrong running that command.", ephemeral=True)
+                except: pass
+            raise
+        finally:
+            inter.response.finish()
+    wrapper.__timed__ = True
+    return wrapper
+
+def slowest(n:int=15) -> list[tuple[str, CommandStats]]:
+    rows = [(name, st) for name, st in command_stats.items() if st.samples]
+    rows.sort(key=lambda r: r[1].p95, reverse=True)
+    return rows[:n]
@@ -0,0 +1,201 @@
+# =========================
+# content_scan.py
+# =========================
+# One pass over a message's content, shared by automod, triggers and AFK.
+import re, time, unicodedata
+from collections import OrderedDict
+from functools import lru_cache
+
+# links / invites are searched on their own, unanchored, so a word glued to the front
+# ("xhttps://...", "joindiscord.gg/...") can't swallow them; the single pass is words + mentions
+_URL_RE = re.compile(r"(?:https?://|www\.)\S*")
+_INVITE_RE = re.compile(r"(?:discord\.gg|discord\.com/invite)/\S*")
+_SCAN_RE = re.compile(r"<@!?(?P<mention>\d+)>|(?P<word>\w+)")
+
+SCAN_CACHE_SIZE = 512
+NORMALIZE_CACHE_SIZE = 4096
+
+def _is_word_char(c:str) -> bool:
+    # same definition re uses for \w on str patterns
+    return c.isalnum() or c == "_"
+
+class MessageScan:
+    __slots__ = ("raw", "text", "tokens", "words", "urls", "invites", "mentions", "_norm")
+
+    def __init__(self, content:str, mention_ids=()):
+        self.raw = content or ""
+        self.text = self.raw.lower()
+        self.tokens: list[tuple[int, int, str]] = []   # (start, end, word) offsets into .text
+        self.urls: list[str] = []
+        self.invites: list[str] = []
+        self.mentions: set[int] = set(mention_ids)
+        t = self.text
+        if "www." in t or "://" in t:
+            self.urls = _URL_RE.findall(t)
+        if "discord" in t:
+            self.invites = _INVITE_RE.findall(t)
+        for m in _SCAN_RE.finditer(t):
+            if m.lastgroup == "word":
+                self.tokens.append((m.start(), m.end(), m.group()))
+            else:
+                self.mentions.add(int(m.group("mention")))
+        self.words = {t[2] for t in self.tokens}
+        self._norm = None
+
+    @property
+    def normalized(self) -> tuple["MessageScan", ...]:
+        # confusable/spacing-folded view (+ a leetspeak view when it differs), only built when something asks for it
+        if self._norm is None:
+            self._norm = normalized_scans(self.raw)
+        return self._norm
+
+    @property
+    def has_link(self) -> bool:
+        return bool(self.urls)
+
+    @property
+    def has_invite(self) -> bool:
+        return bool(self.invites)
+
+    def _boundary(self, pos:int) -> bool:
+        # equivalent of re's \b at pos
+        t = self.text
+        before = pos > 0 and _is_word_char(t[pos-1])
+        after = pos < len(t) and _is_word_char(t[pos])
+        return before != after
+
+    def has_word(self, word:str) -> bool:
+        # whole-word / whole-phrase match, case-insensitive (same as \bword\b with re.I)
+        w = (word or "").lower()
+        if not w:
+            return False
+        if w in self.words:
+            return True
+        t = self.text
+        i = t.find(w)
+        while i != -1:
+            if self._boundary(i) and self._boundary(i + len(w)):
+                return True
+            i = t.find(w, i + 1)
+        return False
+
+    def first_word(self, words):
+        for w in words:
+            if self.has_word(w):
+                return w
+        return None
+
+    def first_blocked(self, words):
+        # like first_word, but also catches confusables, zero-width chars and "b a d" spacing
+        w = self.first_word(words)
+        if w:
+            return w
+        for view in self.normalized:
+            for w in words:
+                if view.has_word(normalize_text(w)):
+                    return w
+        return None
+
+# ---------------------------
+# NORMALIZER (blocked words)
+# ---------------------------
+_FOLD = {c: None for c in map(ord, "\u00ad\u034f\u180e\u200b\u200c\u200d\u200e\u200f\u2060\u2061\u2062\u2063\u2064\ufeff")}
+_FOLD.update({ord(k): v for k, v in {
+    # cyrillic / greek lookalikes
+    "а": "a", "в": "b", "е": "e", "к": "k", "м": "m", "н": "h", "о": "o", "р": "p", "с": "c",
+    "т": "t", "у": "y", "х": "x", "і": "i", "ј": "j", "ѕ": "s", "ԁ": "d", "ɡ": "g", "ո": "n",
+    "α": "a", "β": "b", "ε": "e", "η": "n", "ι": "i", "κ": "k", "ν": "v", "ο": "o", "ρ": "p",
+    "τ": "t", "υ": "u", "χ": "x",
+    "_": " ",
+}.items()})
+# leetspeak: only folded inside tokens that also have letters ("h3ll0", "a$$"), never in plain numbers ("455")
+_LEET = str.maketrans({"0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t", "8": "b",
+                       "@": "a", "$": "s", "!": "i", "|": "l"})
+_LEET_CHARS = frozenset("0134578@$!|")
+_TOKEN_RE = re.compile(r"\S+")
+
+# runs of single characters split by separators: "b a d", "b.a.d", "b - a - d"
+_SPACED_RE = re.compile(r"(?<!\w)(?:\w\W{1,3}){2,}\w(?!\w)")
+_NON_WORD_RE = re.compile(r"\W+")
+_REAL_SINGLES = frozenset("ai")   # one-letter words that can sit next to a spaced-out word: "a b a d"
+
+norm_stats = {"calls": 0, "misses": 0, "miss_time": 0.0}
+
+def _fold(text:str) -> str:
+    t = unicodedata.normalize("NFKC", text).casefold()
+    if not t.isascii():
+        # strip accents: "bàd" -> "bad"
+        t = "".join(c for c in unicodedata.normalize("NFKD", t) if not unicodedata.combining(c))
+    return t.translate(_FOLD)
+
+def _leet_token(m) -> str:
+    tok = m.group()
+    if any(c in _LEET_CHARS for c in tok) and any(c.isalpha() for c in tok):
+        return tok.translate(_LEET)
+    return tok
+
+def _collapse(t:str, extra:set) -> str:
+    # "b a d" -> "bad"; if the run holds a real one-letter word, the pieces between those
+    # letters go into extra as well, so "a b a d" still yields "bad"
+    def sub(m):
+        run = _NON_WORD_RE.sub("", m.group())
+        cuts = [i for i, c in enumerate(run) if c in _REAL_SINGLES]
+        if cuts:
+            starts = {0, *(i + 1 for i in cuts)}
+            ends = {len(run), *cuts}
+            extra.update(run[a:b] for a in starts for b in ends if b - a >= 2)
+        return run
+    return _SPACED_RE.sub(sub, t)
+
+def _view(t:str) -> tuple[str, MessageScan]:
+    extra = set()
+    t = _collapse(t, extra)
+    s = MessageScan(t)
+    s.words |= extra
+    return t, s
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _normalized(content:str) -> tuple[str, tuple[MessageScan, ...]]:
+    t0 = time.perf_counter()
+    base = _fold(content)
+    folded, s = _view(base)
+    views = (s,)
+    if not _LEET_CHARS.isdisjoint(base):
+        leet = _TOKEN_RE.sub(_leet_token, base)
+        if leet != base:
+            views += (_view(leet)[1],)   # a second candidate, next to the plain fold, not instead of it
+    norm_stats["misses"] += 1
+    norm_stats["miss_time"] += time.perf_counter() - t0
+    return folded, views
+
+def normalize_text(content:str) -> str:
+    norm_stats["calls"] += 1
+    return _normalized(content or "")[0]
+
+def normalized_scans(content:str) -> tuple[MessageScan, ...]:
+    norm_stats["calls"] += 1
+    return _normalized(content or "")[1]
+
+def normalizer_stats() -> dict:
+    calls, misses, t = norm_stats["calls"], norm_stats["misses"], norm_stats["miss_time"]
+    return {
+        "calls": calls,
+        "hit_rate": (calls - misses) / calls if calls else 0.0,
+        "msgs_per_sec": misses / t if t else 0.0,   # uncached normalization throughput
+        "cached": _normalized.cache_info().currsize,
+    }
+
+_scan_cache: "OrderedDict[int, MessageScan]" = OrderedDict()
+
+def scan_message(message) -> MessageScan:
+    # every listener for the same message gets the same scan object
+    content = message.content or ""
+    s = _scan_cache.get(message.id)
+    if s is not None and s.raw == content:
+        _scan_cache.move_to_end(message.id)
+        return s
+    s = MessageScan(content, message.raw_mentions)
+    _scan_cache[message.id] = s
+    if len(_scan_cache) > SCAN_CACHE_SIZE:
+        _scan_cache.popitem(last=False)
+    return s
@@ -0,0 +1,723 @@
+# =========================
+# core.py
+# =========================
+# Shared kernel for main.py and the extensions: config, the bot object, stored
+# data, permission helpers, logging helpers and the in-memory state (snipes,
+# content cache, spam windows, raid state) that must outlive extension reloads.
+import os, io, gzip, json, time, math, hashlib, asyncio, contextlib
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+
+import discord
+from discord.ext import commands
+from discord import app_commands
+
+from message_cache import ContentCache
+from fetch_cache import FetchCache
+from guild_index import GuildIndex
+from command_timing import timed
+from raid_detector import JoinRate
+from outbound import scheduler, LOG, MOD
+from shared_state import SharedState
+
+# ---------------------------
+# ENV / CONSTANTS
+# ---------------------------
+TOKEN = os.getenv("DISCORD_BOT_TOKEN", "").strip()
+
+OWNER_ID = int(os.getenv("OWNER_ID", "1319292111325106296"))
+# Default extra admins you mentioned:
+DEFAULT_ADMINS = {1319292111325106296, 1380315427992768633, 909468887098216499}
+
+RENDER_API_KEY   = os.getenv("RENDER_API_KEY", "").strip()
+RENDER_SERVICE_ID= os.getenv("RENDER_SERVICE_ID", "").strip()
+
+DEV_GUILD_ID = int(os.getenv("DEV_GUILD_ID", "0") or 0) or None   # optional: also sync commands here (instant)
+
+DATA_FILE   = "data.json"
+SNIPES_KEEP = 50          # how many to keep per channel
+ESNIPES_KEEP= 50
+MAX_MESSAGES = int(os.getenv("MAX_MESSAGES", "200"))                     # discord.py's full Message cache
+# Member cache profile: "full" caches every member (chunked at startup), "lean" only members seen
+# joining or fetched (guilds chunked lazily on first use), "none" caches no members at all
+MEMBER_CACHE = os.getenv("MEMBER_CACHE", "full").strip().lower()
+CHUNK_AT_STARTUP = os.getenv("CHUNK_AT_STARTUP", "1" if MEMBER_CACHE == "full" else "0").lower() in ("1", "true", "yes")
+CONTENT_CACHE_BYTES = int(os.getenv("CONTENT_CACHE_MB", "16")) * 1024**2  # our content-only cache
+SPAM_WINDOW = 7           # seconds (default; can be overridden via automod)
+SPAM_THRESHOLD = 5        # msgs in window (default; can be overridden)
+DEFAULT_TIMEOUT_SECS = 300
+DUPE_WINDOW = 120         # seconds a fingerprint stays comparable
+DUPE_THRESHOLD = 4        # copies (incl. current) before acting
+DUPE_MIN_LENGTH = 20      # word chars; shorter messages are not fingerprinted
+FETCH_CACHE_SIZE = int(os.getenv("FETCH_CACHE_SIZE", "2000"))   # users / members kept from REST lookups
+FETCH_CACHE_TTL  = 600    # seconds a fetched user / member is reused
+
+# Sharding: SHARDED=1 uses AutoShardedBot; SHARD_COUNT / SHARD_IDS (comma list) pin the layout
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", "0") or 0) or None
+SHARD_IDS   = [int(x) for x in os.getenv("SHARD_IDS", "").split(",") if x.strip()] or None
+
+# Cluster mode (see cluster.py): CLUSTER_COUNT processes, each owning a contiguous slice of
+# SHARD_COUNT shards, sharing state through a SQLite file (STATE_DB) instead of data.json
+CLUSTER_ID    = int(os.getenv("CLUSTER_ID", "0"))
+CLUSTER_COUNT = int(os.getenv("CLUSTER_COUNT", "1"))
+STATE_DB      = os.getenv("STATE_DB", "").strip() or ("state.db" if CLUSTER_COUNT > 1 else "")
+STATE_POLL_SECS = 2
+if CLUSTER_COUNT > 1 and not SHARD_IDS:
+    if not SHARD_COUNT:
+        raise RuntimeError("SHARD_COUNT must be set when CLUSTER_COUNT > 1")
+    per = math.ceil(SHARD_COUNT / CLUSTER_COUNT)
+    SHARD_IDS = list(range(CLUSTER_ID * per, min(SHARD_COUNT, (CLUSTER_ID + 1) * per))) or None
+    if not SHARD_IDS:
+        raise RuntimeError(f"Cluster {CLUSTER_ID} has no shards (SHARD_COUNT={SHARD_COUNT}, CLUSTER_COUNT={CLUSTER_COUNT})")
+SHARDED     = os.getenv("SHARDED", "").lower() in ("1", "true", "yes") or bool(SHARD_COUNT or SHARD_IDS)
+
+# ---------------------------
+# INTENTS / BOT
+# ---------------------------
+intents = discord.Intents.default()
+intents.message_content = True
+intents.members = True
+intents.guilds  = True
+intents.presences = False
+
+def member_cache_flags():
+    if MEMBER_CACHE == "none":
+        return discord.MemberCacheFlags.none()
+    if MEMBER_CACHE == "lean":
+        return discord.MemberCacheFlags(voice=False, joined=True)
+    return discord.MemberCacheFlags.from_intents(intents)
+
+bot_kwargs = dict(command_prefix="?", intents=intents, help_command=None, max_messages=MAX_MESSAGES,
+                  member_cache_flags=member_cache_flags(), chunk_guilds_at_startup=CHUNK_AT_STARTUP)
+if SHARDED:
+    bot = commands.AutoShardedBot(shard_count=SHARD_COUNT, shard_ids=SHARD_IDS, **bot_kwargs)
+else:
+    bot = commands.Bot(**bot_kwargs)
+
+# ---------------------------
+# STORAGE
+# ---------------------------
+shared: SharedState | None = None   # cluster mode: opened by load_state(), not at import
+
+def load_data():
+    if shared and not shared.empty():
+        return shared.load()
+    if not os.path.exists(DATA_FILE):
+        base = {
+            "admins": list(DEFAULT_ADMINS),
+            "pookies": [],
+            "trusted": [],
+            "blacklist": [],
+            "blocked_words": [],
+            "automod": {
+                "enabled": True,
+                "anti_link": {"enabled": True, "action": "delete"},
+                "anti_invite": {"enabled": True, "action": "delete"},
+                "blocked_words": {"enabled": True, "action": "delete"},
+                "anti_spam": {"enabled": True, "window": SPAM_WINDOW, "threshold": SPAM_THRESHOLD, "action": "timeout", "duration": DEFAULT_TIMEOUT_SECS},
+                "anti_dupe": {"enabled": False, "window": DUPE_WINDOW, "threshold": DUPE_THRESHOLD, "action": "delete"},
+                "trusted_bypass": True
+            },
+            "log_channel": {},              # guild_id -> channel_id
+            "cat_daily_channel": {},        # guild_id -> channel_id
+            "cat_hourly_channels": {},      # guild_id -> [channel_ids]
+            "triggers": {},                 # guild_id -> { word: reply }
+            "warns": {},                    # guild_id -> { user_id: [ {reason, mod, ts} ] }
+            "warn_policy": {},              # guild_id -> {decay_days, timeout_at, timeout_secs, kick_at, ban_at}
+            "raid_policy": {},              # guild_id -> {enabled, window, joins, new_account_days, new_joins, action, duration, minutes}
+            "temp_roles": [],               # [{guild_id,user_id,role_id,expires}]
+            "afk": {},                      # user_id -> {reason, since, expires}
+            "regex_rules": {}               # guild_id -> [ {pattern, action, enabled, strikes} ]
+        }
+        save_data(base)
+        return base
+    with open(DATA_FILE, "r", encoding="utf-8") as f:
+        d = json.load(f)
+    if shared:
+        shared.save(d)  # first cluster boot: seed the shared store from data.json
+    return d
+
+def save_data(d):
+    invalidate_caches()
+    if shared:
+        shared.save(d)
+        return
+    tmp = DATA_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(d, f, indent=2)
+    os.replace(tmp, DATA_FILE)
+
+# filled by load_state() from setup_hook, not at import; always mutated in place so
+# `from core import data` stays valid everywhere
+data: dict = {}
+
+def load_state():
+    global shared
+    if STATE_DB and shared is None:
+        shared = SharedState(STATE_DB)   # once per process; a state reload reuses it
+    fresh = load_data()
+    data.clear()
+    data.update(fresh)
+    invalidate_caches()
+
+# admins / pookies / trusted / blacklist as frozensets; dropped on every save and on
+# changes pulled from other cluster processes
+_id_sets: dict[str, frozenset] = {}
+
+def id_set(key:str) -> frozenset:
+    s = _id_sets.get(key)
+    if s is None:
+        s = _id_sets[key] = frozenset(data.get(key, []))
+    return s
+
+def invalidate_caches():
+    _id_sets.clear()
+
+def pull_shared_changes() -> list[str]:
+    changes = shared.poll() if shared else {}
+    if changes:
+        data.update(changes)
+        invalidate_caches()
+    return list(changes)
+
+# quick refs
+def guild_map(dct_name):
+    return data.get(dct_name, {})
+
+def get_log_channel_id(gid:int):
+    return data.get("log_channel", {}).get(str(gid))
+
+def set_log_channel_id(gid:int, cid:int|None):
+    data.setdefault("log_channel", {})
+    if cid is None:
+        data["log_channel"].pop(str(gid), None)
+    else:
+        data["log_channel"][str(gid)] = cid
+    save_data(data)
+
+def trigger_map(gid:int):
+    data.setdefault("triggers", {})
+    data["triggers"].setdefault(str(gid), {})
+    return data["triggers"][str(gid)]
+
+def warns_map(gid:int):
+    data.setdefault("warns", {})
+    data["warns"].setdefault(str(gid), {})
+    return data["warns"][str(gid)]
+
+def afk_map():
+    return data.setdefault("afk", {})
+
+def afk_ids() -> frozenset:
+    # int ids of AFK users, for set intersection with message mentions; dropped with the id sets
+    s = _id_sets.get("afk")
+    if s is None:
+        s = _id_sets["afk"] = frozenset(int(k) for k in data.get("afk", {}))
+    return s
+
+def hourly_cat_map(gid:int):
+    data.setdefault("cat_hourly_channels", {})
+    data["cat_hourly_channels"].setdefault(str(gid), [])
+    return data["cat_hourly_channels"][str(gid)]
+
+def regex_rules_map(gid:int):
+    data.setdefault("regex_rules", {})
+    data["regex_rules"].setdefault(str(gid), [])
+    return data["regex_rules"][str(gid)]
+
+# ---------------------------
+# PERMS HELPERS
+# ---------------------------
+def is_owner(u:discord.abc.User):
+    return u.id == OWNER_ID
+
+def is_pookie(u:discord.abc.User):
+    return is_owner(u) or (u.id in id_set("pookies"))
+
+def is_admin(u:discord.abc.User):
+    return is_pookie(u) or (u.id in id_set("admins"))
+
+def is_trusted(u:discord.abc.User):
+    return u.id in id_set("trusted")
+
+def is_blacklisted(u:discord.abc.User):
+    return u.id in id_set("blacklist")
+
+def mod_user(u:discord.abc.User):
+    return is_admin(u) or is_pookie(u)
+
+# Global command block for blacklist
+@bot.check
+async def not_blacklisted(ctx:commands.Context):
+    return not is_blacklisted(ctx.author)
+
+def AM(color=0x2B2D31, title=None, desc=None):
+    e = discord.Embed(color=color, timestamp=datetime.utcnow())
+    if title: e.title = title
+    if desc:  e.description = desc
+    return e
+
+def snowflake_age(sf:int):
+    # approximate from timestamp within snowflake
+    try:
+        ts = ((sf >> 22) + 1420070400000) / 1000
+        dt = datetime.utcfromtimestamp(ts)
+        return dt
+    except:
+        return None
+
+def human_timedelta(seconds:int):
+    seconds = int(seconds)
+    m, s = divmod(seconds, 60)
+    h, m = divmod(m, 60)
+    d, h = divmod(h, 24)
+    parts = []
+    if d: parts.append(f"{d}d")
+    if h: parts.append(f"{h}h")
+    if m: parts.append(f"{m}m")
+    parts.append(f"{s}s")
+    return " ".join(parts)
+
+def account_age_str(user: discord.abc.User):
+    created = snowflake_age(user.id)
+    if not created:
+        return "N/A"
+    delta = datetime.utcnow() - created
+    days = delta.days
+    return f"{days} days (created <t:{int(created.timestamp())}:R>)"
+
+def user_label(guild:discord.Guild, uid:int) -> str:
+    u = guild.get_member(uid) or bot.get_user(uid)
+    return str(u) if u else "Unknown user"
+
+# ---------------------------
+# CHECKERS (for slash)
+# ---------------------------
+def timed_check(predicate):
+    # every slash command carries one of the checks below, so this is also where its
+    # callback picks up latency tracking / auto-defer (command_timing.timed), once
+    check = app_commands.check(predicate)
+    def deco(func):
+        if not isinstance(func, app_commands.Command) and not getattr(func, "__timed__", False):
+            func = timed(func)
+        return check(func)
+    return deco
+
+def app_cmd_check_blacklist():
+    async def predicate(inter:discord.Interaction):
+        if is_blacklisted(inter.user):
+            await inter.response.send_message("You are blacklisted from using commands.", ephemeral=True)
+            return False
+        return True
+    return timed_check(predicate)
+
+def app_cmd_check_admin():
+    async def predicate(inter:discord.Interaction):
+        if not is_admin(inter.user):
+            await inter.response.send_message("Admin-only command.", ephemeral=True)
+            return False
+        return True
+    return timed_check(predicate)
+
+def app_cmd_check_pookie_or_owner():
+    async def predicate(inter:discord.Interaction):
+        if not is_pookie(inter.user):
+            await inter.response.send_message("Pookie/Owner-only command.", ephemeral=True)
+            return False
+        return True
+    return timed_check(predicate)
+
+# ---------------------------
+# LOGGING
+# ---------------------------
+async def send_log(guild:discord.Guild, embed:discord.Embed, file:discord.File|None=None):
+    cid = get_log_channel_id(guild.id)
+    if not cid: return
+    ch = guild.get_channel(cid)
+    if not ch:
+        try:
+            ch = await guild.fetch_channel(cid)
+        except:
+            return
+    # lowest-but-one priority; may be shed if the log queue backs up
+    scheduler.fire(LOG, ("ch", ch.id), lambda: ch.send(embed=embed, file=file, allowed_mentions=discord.AllowedMentions.none()), guild=guild.id)
+
+# ---- Bulk deletions: one summary + transcript instead of one log per message ----
+BULK_LOG_GRACE = 2        # seconds to wait for trailing delete events after a purge
+
+class PurgeScope:
+    # one running purge: the ids it deletes (claimed before the request) and the entries buffered for its log
+    __slots__ = ("ids", "entries")
+    def __init__(self):
+        self.ids: set[int] = set()
+        self.entries: list[tuple] = []
+
+    def claim(self, ids):
+        self.ids.update(ids)
+
+purging: dict[int, list[PurgeScope]] = {}   # channel_id -> purges running there, oldest first
+
+def purge_buffer(channel_id:int, mid:int) -> list|None:
+    # where a delete event in this channel goes: the purge that claimed the id, else the newest one
+    scopes = purging.get(channel_id)
+    if not scopes:
+        return None
+    for sc in scopes:
+        if mid in sc.ids:
+            return sc.entries
+    return scopes[-1].entries
+
+def deleted_entry(mid:int, msg:discord.Message|None, entry:tuple|None):
+    # (message_id, author_id, content, attachment); author_id None when we never saw it
+    if msg:
+        return (mid, msg.author.id, msg.content or "", msg.attachments[0].url if msg.attachments else None)
+    if entry:
+        return (mid, entry[0], entry[2], entry[3])
+    return (mid, None, "", None)
+
+async def log_bulk_delete(guild:discord.Guild, channel_id:int, entries:list[tuple], actor:discord.abc.User|None=None):
+    entries = sorted(entries)
+    known = [x for x in entries if x[1] is not None]
+    lines = []
+    for mid, uid, content, att in known:
+        ts = discord.utils.snowflake_time(mid).strftime("%Y-%m-%d %H:%M:%S")
+        lines.append(f"[{ts} UTC] {user_label(guild, uid)} ({uid}): {content}" + (f" [{att}]" if att else ""))
+    e = AM(0xAA3333, "Bulk Message Delete")
+    e.add_field(name="Channel", value=f"<#{channel_id}>", inline=True)
+    e.add_field(name="Messages", value=f"{len(entries)} ({len(entries)-len(known)} not cached)", inline=True)
+    if actor:
+        e.add_field(name="By", value=f"{actor} ({actor.id})", inline=True)
+    authors = defaultdict(int)
+    for x in known:
+        authors[x[1]] += 1
+    if authors:
+        top = sorted(authors.items(), key=lambda kv: -kv[1])[:10]
+        e.add_field(name="Authors", value="\n".join(f"<@{uid}> × {n}" for uid, n in top), inline=False)
+    f = None
+    if lines:
+        f = discord.File(io.BytesIO("\n".join(lines).encode()), filename=f"deleted-{channel_id}.txt")
+    await send_log(guild, e, file=f)
+
+@contextlib.asynccontextmanager
+async def purge_scope(channel:discord.abc.GuildChannel, actor:discord.abc.User|None=None, log:bool=True):
+    # buffer delete events for this channel and log them as one entry afterwards;
+    # overlapping purges in one channel each get their own scope and their own entry.
+    # log=False: the caller already logs the deletion itself, the events are just swallowed
+    scope = PurgeScope()
+    purging.setdefault(channel.id, []).append(scope)
+    try:
+        yield scope
+    finally:
+        async def flush():
+            await asyncio.sleep(BULK_LOG_GRACE)
+            scopes = purging.get(channel.id, [])
+            if scope in scopes:
+                scopes.remove(scope)
+            if not scopes:
+                purging.pop(channel.id, None)
+            if log and scope.entries:
+                await log_bulk_delete(channel.guild, channel.id, scope.entries, actor)
+        asyncio.create_task(flush())
+
+# ---- Role changes made by the bot itself (logged as one summary by whoever made them) ----
+role_ops_expected: dict[tuple[int, int, int], float] = {}  # (guild_id, member_id, role_id) -> expiry
+
+def expect_role_change(gid:int, uid:int, rid:int, ttl:int=60):
+    # a bulk operation is about to change this role and logs its own summary
+    now = time.time()
+    if len(role_ops_expected) > 5000:
+        for k, exp in list(role_ops_expected.items()):
+            if exp < now: role_ops_expected.pop(k, None)
+    role_ops_expected[(gid, uid, rid)] = now + ttl
+
+def consume_expected(gid:int, uid:int, rid:int) -> bool:
+    exp = role_ops_expected.pop((gid, uid, rid), None)
+    return exp is not None and exp >= time.time()
+
+async def set_channel_lock(channel:discord.abc.GuildChannel, locked:bool, reason:str):
+    ov = channel.overwrites_for(channel.guild.default_role)
+    ov.send_messages = False if locked else None
+    await channel.set_permissions(channel.guild.default_role, overwrite=ov, reason=reason)
+
+# ---------------------------
+# WARNS (shared by /warn and automod's "warn" action)
+# ---------------------------
+# stored per (guild, user): data["warns"][guild_id][user_id] -> [ {reason, mod, ts} ], oldest first
+WARN_DEFAULTS = {
+    "decay_days": 30,         # warns older than this stop counting (0 = never)
+    "timeout_at": 0,          # active warns that trigger each step (0 = off; set with /warn_config)
+    "timeout_secs": 3600,
+    "kick_at": 0,
+    "ban_at": 0,
+}
+WARN_HISTORY_KEEP = 50        # per user; oldest expired warns are dropped past this
+
+def warn_cfg(gid:int) -> dict:
+    cfg = dict(WARN_DEFAULTS)
+    cfg.update(data.get("warn_policy", {}).get(str(gid), {}))
+    return cfg
+
+def user_warns(gid:int, uid:int) -> list[dict]:
+    return warns_map(gid).setdefault(str(uid), [])
+
+def warn_active(w:dict, cfg:dict, now:float) -> bool:
+    return not cfg["decay_days"] or now - w["ts"] < cfg["decay_days"] * 86400
+
+def active_warn_count(gid:int, uid:int) -> int:
+    cfg, now = warn_cfg(gid), time.time()
+    return sum(1 for w in warns_map(gid).get(str(uid), []) if warn_active(w, cfg, now))
+
+async def add_warn(guild:discord.Guild, user:discord.abc.User, reason:str, mod_id:int) -> tuple[int, str|None]:
+    # stores the warn, then checks only the step this warn crossed; returns (active warns, escalation)
+    cfg, now = warn_cfg(guild.id), time.time()
+    arr = user_warns(guild.id, user.id)
+    arr.append({"reason": reason, "mod": mod_id, "ts": int(now)})
+    while len(arr) > WARN_HISTORY_KEEP and not warn_active(arr[0], cfg, now):
+        arr.pop(0)
+    save_data(data)
+    count = sum(1 for w in arr if warn_active(w, cfg, now))
+    step = next((a for a in ("ban", "kick", "timeout") if cfg[f"{a}_at"] and count - 1 < cfg[f"{a}_at"] <= count), None)
+    if not step:
+        return count, None
+    why = f"{count} active warns (latest: {reason})"[:400]
+    try:
+        if step == "ban":
+            await scheduler.run(MOD, ("guild", guild.id), lambda: guild.ban(discord.Object(id=user.id), reason=why, delete_message_seconds=0))
+            done = "banned"
+        elif step == "kick":
+            await scheduler.run(MOD, ("guild", guild.id), lambda: guild.kick(discord.Object(id=user.id), reason=why))
+            done = "kicked"
+        else:
+            member = user if isinstance(user, discord.Member) else await resolve_member(guild, user.id)
+            until = discord.utils.utcnow() + timedelta(seconds=cfg["timeout_secs"])
+            await scheduler.run(MOD, ("guild", guild.id), lambda: member.timeout(until, reason=why))
+            done = f"timed out for {human_timedelta(cfg['timeout_secs'])}"
+    except Exception as e:
+        done = f"{step} failed ({type(e).__name__})"
+    e = AM(0xE67E22, "Warn Escalation")
+    e.add_field(name="User", value=f"{user} ({user.id})", inline=False)
+    e.add_field(name="Active warns", value=str(count), inline=True)
+    e.add_field(name="Action", value=done, inline=True)
+    await send_log(guild, e)
+    return count, done
+
+# ---------------------------
+# VOLATILE STATE (kept here so extension reloads don't drop it)
+# ---------------------------
+snipes   : dict[int, deque] = defaultdict(lambda: deque(maxlen=SNIPES_KEEP))   # channel_id -> deque of dict
+esnipes  : dict[int, deque] = defaultdict(lambda: deque(maxlen=ESNIPES_KEEP))  # channel_id -> deque of dict
+content_cache = ContentCache(CONTENT_CACHE_BYTES)  # message_id -> (author_id, channel_id, content, attachment)
+recent_msgs: dict[int, dict[int, deque]] = defaultdict(lambda: defaultdict(lambda: deque(maxlen=30)))
+# recent_msgs[guild_id][user_id] -> deque of (timestamp, message_id, channel_id)
+pending_role_logs: dict[tuple[int, int], dict] = {}    # (guild_id, member_id) -> {"added": set, "removed": set}
+join_rates: dict[int, JoinRate] = {}   # guild_id -> window
+raid_state: dict[int, dict] = {}       # guild_id -> {"until", "locked", "joins", "timed_out", "task", "ended_by"}
+guild_index = GuildIndex()             # for /servers; maintained by the admin extension
+
+def cache_message_content(msg:discord.Message):
+    att = msg.attachments[0].url if msg.attachments else None
+    content_cache.put(msg.id, msg.author.id, msg.channel.id, msg.content or "", att)
+
+# ---------------------------
+# WARM RESTART SNAPSHOT
+# ---------------------------
+# The volatile state above is written to a small gzip'd JSON file on graceful shutdown
+# and read back (minus anything stale) by the next process's setup_hook.
+SNAPSHOT_FILE = os.getenv("SNAPSHOT_FILE", "").strip() or (f"snapshot-{CLUSTER_ID}.json.gz" if CLUSTER_COUNT > 1 else "snapshot.json.gz")
+SNIPE_RESTORE_TTL = 6 * 3600   # seconds; older snipes / esnipes are not restored
+
+def write_snapshot():
+    snap = {
+        "ts": time.time(),
+        "snipes": {cid: list(q) for cid, q in snipes.items() if q},
+        "esnipes": {cid: list(q) for cid, q in esnipes.items() if q},
+        "recent_msgs": {gid: {uid: list(q) for uid, q in users.items() if q} for gid, users in recent_msgs.items()},
+    }
+    tmp = SNAPSHOT_FILE + ".tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        json.dump(snap, f, separators=(",", ":"), default=str)
+    os.replace(tmp, SNAPSHOT_FILE)
+
+def restore_snapshot() -> dict:
+    # returns how many entries came back; the file is removed so a later crash can't replay it
+    if not os.path.exists(SNAPSHOT_FILE):
+        return {}
+    try:
+        with gzip.open(SNAPSHOT_FILE, "rt", encoding="utf-8") as f:
+            snap = json.load(f)
+    except Exception as e:
+        print(f"Snapshot unreadable, ignored: {e}")
+        snap = {}
+    try: os.remove(SNAPSHOT_FILE)
+    except: pass
+    now = time.time()
+    counts = {"snipes": 0, "recent_msgs": 0}
+    for key, store in (("snipes", snipes), ("esnipes", esnipes)):
+        for cid, items in snap.get(key, {}).items():
+            items = [x for x in items if now - x.get("ts", 0) <= SNIPE_RESTORE_TTL]
+            store[int(cid)].extend(items)
+            counts["snipes"] += len(items)
+    # spam windows: only entries still inside the configured window matter
+    window = data.get("automod", {}).get("anti_spam", {}).get("window", SPAM_WINDOW)
+    for gid, users in snap.get("recent_msgs", {}).items():
+        for uid, items in users.items():
+            items = [tuple(x) for x in items if now - x[0] <= window]
+            if items:
+                recent_msgs[int(gid)][int(uid)].extend(items)
+                counts["recent_msgs"] += len(items)
+    return counts
+
+def checkpoint():
+    # graceful shutdown: make sure stored data is on disk first, then snapshot the rest
+    if not data:
+        return  # never got as far as loading state; leave any earlier snapshot alone
+    try: save_data(data)
+    except Exception as e: print(f"Final save failed: {e}")
+    try:
+        write_snapshot()
+    except Exception as e:
+        print(f"Snapshot failed: {e}")
+
+# ---------------------------
+# USER / MEMBER RESOLVER
+# ---------------------------
+# gateway cache first, then our TTL cache, then REST (one request per id at a time)
+user_cache   = FetchCache(FETCH_CACHE_SIZE, FETCH_CACHE_TTL)   # user_id -> discord.User
+member_cache = FetchCache(FETCH_CACHE_SIZE, FETCH_CACHE_TTL)   # (guild_id, user_id) -> discord.Member
+
+async def resolve_user(uid:int) -> discord.User:
+    u = bot.get_user(uid)
+    if u:
+        user_cache.gateway += 1
+        return u
+    return await user_cache.fetch(uid, lambda: bot.fetch_user(uid))
+
+async def resolve_member(guild:discord.Guild, uid:int) -> discord.Member:
+    m = guild.get_member(uid)
+    if m:
+        member_cache.gateway += 1
+        return m
+    return await member_cache.fetch((guild.id, uid), lambda: guild.fetch_member(uid))
+
+def resolver_lines() -> list[str]:
+    out = []
+    for name, c in (("users", user_cache), ("members", member_cache)):
+        st = c.stats()
+        out.append(f"{name}: {st['gateway']} gateway / {st['hits']} cached / {st['misses']} REST / {st['joined']} shared, "
+                   f"{st['hit_rate']*100:.0f}% no-REST, {st['size']} kept")
+    return out
+
+# ---------------------------
+# SHARDS / CLUSTER
+# ---------------------------
+shard_stats: dict[int, dict] = defaultdict(lambda: {"events": JoinRate(60), "connects": 0, "disconnects": 0, "resumes": 0, "last_change": None})
+# "events" reuses the join-rate ring as a plain 60s event counter
+
+def owns_guild(gid:int) -> bool:
+    if not SHARD_IDS:
+        return True
+    return (gid >> 22) % (bot.shard_count or SHARD_COUNT) in SHARD_IDS
+
+def count_event(guild:discord.Guild|None):
+    sid = guild.shard_id if guild else 0
+    shard_stats[sid]["events"].add(time.time(), 0)
+
+def shard_latencies() -> list[tuple[int, float]]:
+    return list(bot.latencies) if SHARDED else [(0, bot.latency)]
+
+def shard_lines() -> list[str]:
+    counts = defaultdict(int)
+    for g in bot.guilds:
+        counts[g.shard_id] += 1
+    now = time.time()
+    lines = []
+    for sid, lat in shard_latencies():
+        st = shard_stats[sid]
+        lat_s = "n/a" if math.isnan(lat) or math.isinf(lat) else f"{lat*1000:.0f}ms"
+        lines.append(f"#{sid}: {lat_s}, {counts.get(sid, 0)} guilds, {st['events'].count(now)} ev/min, {st['disconnects']} drops")
+    return lines
+
+# ---------------------------
+# MEMBER CHUNKING / STARTUP PROFILE
+# ---------------------------
+_chunking: dict[int, asyncio.Task] = {}
+start_time = time.time()
+boot_started = time.perf_counter()     # main.py resets this before its own imports
+boot_stages: dict[str, float] = {}     # stage -> seconds, in the order they ran
+startup_profile: dict = {}
+
+async def ensure_chunked(guild:discord.Guild):
+    # lazy chunking: the first command that needs the member list pays for it, once per guild
+    if guild.chunked or MEMBER_CACHE == "none":
+        return
+    t = _chunking.get(guild.id)
+    if t is None or t.done():
+        t = _chunking[guild.id] = asyncio.create_task(guild.chunk(cache=True))
+    await t
+
+@contextlib.contextmanager
+def boot_stage(name:str):
+    t = time.perf_counter()
+    try:
+        yield
+    finally:
+        boot_stages[name] = time.perf_counter() - t
+
+def boot_breakdown() -> str:
+    # "imports 0.41s, state 0.02s, ext 0.30s (automod 0.11s, ...), gateway 2.90s"
+    ext = {k[4:]: v for k, v in boot_stages.items() if k.startswith("ext:")}
+    parts = [f"{k} {v:.2f}s" for k, v in boot_stages.items() if not k.startswith("ext:") and k != "gateway"]
+    if ext:
+        slow = ", ".join(f"{k} {v:.2f}s" for k, v in sorted(ext.items(), key=lambda kv: -kv[1])[:4])
+        parts.append(f"ext {sum(ext.values()):.2f}s ({slow})")
+    if "gateway" in boot_stages:
+        parts.append(f"gateway {boot_stages['gateway']:.2f}s")
+    return ", ".join(parts)
+
+def record_startup():
+    if startup_profile:
+        return
+    import psutil  # only needed once, after login
+    total = time.perf_counter() - boot_started
+    boot_stages["gateway"] = max(0.0, total - sum(v for k, v in boot_stages.items() if k != "gateway"))
+    startup_profile.update({
+        "ready_secs": total,
+        "rss_mb": psutil.Process(os.getpid()).memory_info().rss / 1024**2,
+        "profile": f"members={MEMBER_CACHE}, chunk_at_startup={CHUNK_AT_STARTUP}, max_messages={MAX_MESSAGES}",
+        "guilds": len(bot.guilds),
+        "cached_members": sum(len(g.members) for g in bot.guilds),
+        "stages": boot_breakdown(),
+    })
+    sp = startup_profile
+    print(f"Startup: ready in {sp['ready_secs']:.1f}s, RSS {sp['rss_mb']:.0f} MB, {sp['cached_members']} members cached ({sp['profile']})")
+    print(f"Startup breakdown: {sp['stages']}")
+
+# ---------------------------
+# COMMAND TREE SYNC
+# ---------------------------
+def _command_dict(cmd) -> dict:
+    try:
+        return cmd.to_dict()
+    except TypeError:  # discord.py >= 2.4 takes the tree
+        return cmd.to_dict(bot.tree)
+
+def tree_signature() -> str:
+    # names, params, choices, descriptions, perms: everything Discord stores for a command
+    payload = sorted((_command_dict(c) for c in bot.tree.get_commands()), key=lambda d: (d.get("type", 1), d["name"]))
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+async def sync_tree(force:bool=False, guild:discord.abc.Snowflake|None=None) -> bool:
+    # returns True if a sync was sent to Discord
+    key = f"guild:{guild.id}" if guild else "global"
+    sig = tree_signature()
+    state = data.setdefault("tree_sync", {})
+    if not force and state.get(key) == sig:
+        return False
+    if guild:
+        bot.tree.copy_global_to(guild=guild)
+        await bot.tree.sync(guild=guild)
+    else:
+        await bot.tree.sync()
+    state[key] = sig
+    save_data(data)
+    return True
@@ -0,0 +1,66 @@
+# =========================
+# fetch_cache.py
+# =========================
+# Bounded TTL cache in front of REST lookups (fetch_user / fetch_member).
+# Concurrent lookups for the same key share one request.
+import time, asyncio
+from collections import OrderedDict
+
+class FetchCache:
+    # key -> (expires_at, value)
+    def __init__(self, max_items:int, ttl:float):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._items: "OrderedDict[object, tuple]" = OrderedDict()
+        self._inflight: dict[object, asyncio.Future] = {}
+        self.gateway = 0   # answered by discord.py's own cache before we were asked
+        self.hits = 0
+        self.misses = 0    # REST calls made
+        self.joined = 0    # callers that waited on someone else's REST call
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        entry = self._items.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._items[key]
+            return None
+        self._items.move_to_end(key)
+        return entry[1]
+
+    def put(self, key, value):
+        self._items[key] = (time.monotonic() + self.ttl, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+    def invalidate(self, key):
+        self._items.pop(key, None)
+
+    async def fetch(self, key, factory):
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        fut = self._inflight.get(key)
+        if fut is not None:
+            self.joined += 1
+        else:
+            self.misses += 1
+            fut = self._inflight[key] = asyncio.ensure_future(factory())
+            fut.add_done_callback(lambda f: self._done(key, f))
+        # shield: one caller giving up must not cancel the request the others wait on
+        return await asyncio.shield(fut)
+
+    def _done(self, key, fut:asyncio.Future):
+        self._inflight.pop(key, None)
+        if not fut.cancelled() and fut.exception() is None and fut.result() is not None:
+            self.put(key, fut.result())
+
+    def stats(self) -> dict:
+        lookups = self.gateway + self.hits + self.misses + self.joined
+        return {"gateway": self.gateway, "hits": self.hits, "misses": self.misses, "joined": self.joined,
+                "size": len(self._items), "hit_rate": (lookups - self.misses) / lookups if lookups else 0.0}
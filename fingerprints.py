@@ -0,0 +1,88 @@
+# =========================
+# fingerprints.py
+# =========================
+# SimHash fingerprints + a bounded per-guild index for near-duplicate spam.
+import hashlib
+from collections import defaultdict, deque
+from functools import lru_cache
+
+BITS = 64
+MAX_DISTANCE = 10         # hamming bits still counted as "the same text" (one added/dropped word is ~4-8)
+BANDS = MAX_DISTANCE + 1  # pigeonhole: any pair within MAX_DISTANCE bits agrees on at least one band
+# 64 bits over 11 bands: nine 6-bit bands and two 5-bit bands, as (shift, mask)
+_BAND_SPANS = []
+_shift = 0
+for _b in range(BANDS):
+    _w = BITS // BANDS + (1 if _b < BITS % BANDS else 0)
+    _BAND_SPANS.append((_shift, (1 << _w) - 1))
+    _shift += _w
+MAX_ENTRIES = 2000        # per guild
+
+@lru_cache(maxsize=8192)
+def _feature_hash(feature:str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+
+def simhash(words:list[str]) -> int:
+    # unigrams + bigrams so word order matters a little
+    feats = list(words)
+    feats += [f"{a} {b}" for a, b in zip(words, words[1:])]
+    if not feats:
+        return 0
+    v = [0] * BITS
+    for f in feats:
+        h = _feature_hash(f)
+        for i in range(BITS):
+            v[i] += 1 if (h >> i) & 1 else -1
+    fp = 0
+    for i in range(BITS):
+        if v[i] > 0:
+            fp |= 1 << i
+    return fp
+
+class DupeIndex:
+    # entries are (ts, fingerprint, message_id, channel_id, user_id), oldest first.
+    # every band bucket is also oldest-first, so eviction is popleft everywhere.
+    def __init__(self, max_entries:int=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries: deque = deque()
+        self.bands: list[dict[int, deque]] = [defaultdict(deque) for _ in range(BANDS)]
+        self.removed: set[int] = set()   # message ids already cleaned up
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _evict(self):
+        e = self.entries.popleft()
+        self.removed.discard(e[2])
+        fp = e[1]
+        for b, (shift, mask) in enumerate(_BAND_SPANS):
+            key = (fp >> shift) & mask
+            bucket = self.bands[b][key]
+            bucket.popleft()
+            if not bucket:
+                del self.bands[b][key]
+
+    def add(self, ts:float, fp:int, message_id:int, channel_id:int, user_id:int, window:float, max_dist:int=MAX_DISTANCE) -> list[tuple]:
+        # returns the earlier entries within window whose fingerprint is within max_dist bits
+        while self.entries and (ts - self.entries[0][0] > window or len(self.entries) >= self.max_entries):
+            self._evict()
+        seen = set()
+        matches = []
+        for b, (shift, mask) in enumerate(_BAND_SPANS):
+            key = (fp >> shift) & mask
+            for e in self.bands[b].get(key, ()):
+                if e[2] in seen:
+                    continue
+                seen.add(e[2])
+                if (e[1] ^ fp).bit_count() <= max_dist:
+                    matches.append(e)
+        entry = (ts, fp, message_id, channel_id, user_id)
+        self.entries.append(entry)
+        for b, (shift, mask) in enumerate(_BAND_SPANS):
+            self.bands[b][(fp >> shift) & mask].append(entry)
+        return matches
+
+    def mark_removed(self, message_ids):
+        self.removed.update(message_ids)
+
+dupe_index: dict[int, DupeIndex] = defaultdict(DupeIndex)   # guild_id -> index
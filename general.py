@@ -0,0 +1,141 @@
+# =========================
+# general.py
+# =========================
+# Everyday utilities: ping, avatar, userinfo, say, showcommands, askforcommand.
+import discord
+from discord.ext import commands
+from discord import app_commands
+
+from core import (AM, send_log, account_age_str, is_admin, is_pookie, is_blacklisted, OWNER_ID, resolve_user,
+                  app_cmd_check_admin, app_cmd_check_blacklist)
+
+# ---- Show Commands (categorized with buttons) ----
+CATEGORIES = {
+    "Fun": ["cat", "snipe", "esnipe"],
+    "Info": ["avatar", "userinfo"],
+    "Moderation": ["ban", "unban", "kick", "timeout", "massban", "masskick", "masstimeout", "purge", "lock", "unlock", "raidmode", "raid_config", "role_add", "role_remove", "role_temp", "warn", "warn_list", "warn_remove", "warn_config"],
+    "Admin": ["say_admin", "set_log_channel", "disable_log_channel", "check_log_channel", "add_blocked_word", "remove_blocked_word", "show_blocked_words", "automod", "regex_rule_add", "regex_rule_remove", "regex_rule_toggle", "regex_rule_list", "trigger_add", "trigger_remove", "trigger_list"],
+    "Pookie/Owner": ["add_admin", "remove_admin", "show_admins", "add_trusted", "remove_trusted", "list_trusted", "add_pookie", "remove_pookie", "list_pookies", "sync", "reload", "restart_service"],
+    "Utilities": ["say", "ping", "servers", "serverinfo", "askforcommand"]
+}
+
+class ShowCmdsView(discord.ui.View):
+    def __init__(self, user:discord.User, accessible:set[str]):
+        super().__init__(timeout=120)
+        self.user = user
+        self.accessible = accessible
+        for cat in CATEGORIES.keys():
+            self.add_item(ShowCmdButton(cat, self.accessible))
+
+class ShowCmdButton(discord.ui.Button):
+    def __init__(self, category:str, accessible:set[str]):
+        super().__init__(label=category, style=discord.ButtonStyle.primary)
+        self.category = category
+        self.accessible = accessible
+    async def callback(self, interaction:discord.Interaction):
+        if interaction.user.id != interaction.message.interaction.user.id:
+            return await interaction.response.send_message("This menu isn't for you.", ephemeral=True)
+        cmds = [c for c in CATEGORIES[self.category] if c in self.accessible]
+        if not cmds: desc = "_No commands available to you in this category._"
+        else: desc = "• " + "\n• ".join(cmds)
+        await interaction.response.edit_message(embed=AM(0x5865F2, f"Commands: {self.category}", desc), view=self.view)
+
+def accessible_commands_for(user:discord.abc.User):
+    # show only commands they can use (based on perms/pookie/admin/blacklist)
+    # we filter by categories definitions above
+    accessible = set()
+    for cat, names in CATEGORIES.items():
+        for name in names:
+            # permission gating:
+            if name in {"add_admin","remove_admin","show_admins","add_trusted","remove_trusted","list_trusted","add_pookie","remove_pookie","list_pookies","sync","reload","restart_service"}:
+                if is_pookie(user):
+                    accessible.add(name)
+            elif name in {"say_admin","set_log_channel","disable_log_channel","check_log_channel","add_blocked_word","remove_blocked_word","show_blocked_words","automod","regex_rule_add","regex_rule_remove","regex_rule_toggle","regex_rule_list","trigger_add","trigger_remove","trigger_list","ban","unban","kick","timeout","massban","masskick","masstimeout","purge","lock","unlock","raidmode","raid_config","role_add","role_remove","role_temp","warn","warn_list","warn_remove","warn_config"}:
+                if is_admin(user):
+                    accessible.add(name)
+            else:
+                # public
+                accessible.add(name)
+    return accessible
+
+class General(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @app_commands.command(name="ping", description="Show latency.")
+    @app_cmd_check_blacklist()
+    async def slash_ping(self, inter:discord.Interaction):
+        await inter.response.send_message(f"Pong! `{round(self.bot.latency*1000)} ms`")
+
+    @app_commands.command(name="avatar", description="Show a user's avatar.")
+    @app_cmd_check_blacklist()
+    @app_commands.describe(user="Target user (optional)")
+    async def slash_avatar(self, inter:discord.Interaction, user:discord.User=None):
+        user = user or inter.user
+        e = AM(0x5865F2, f"Avatar - {user}")
+        e.set_image(url=user.display_avatar.url)
+        await inter.response.send_message(embed=e)
+
+    @app_commands.command(name="userinfo", description="Show user info.")
+    @app_cmd_check_blacklist()
+    @app_commands.describe(user="Target user (optional)")
+    async def slash_userinfo(self, inter:discord.Interaction, user:discord.Member=None):
+        user = user or inter.user
+        e = AM(0x2B2D31, f"User Info - {user}")
+        e.add_field(name="ID", value=str(user.id))
+        e.add_field(name="Account Age", value=account_age_str(user))
+        if isinstance(user, discord.Member):
+            e.add_field(name="Joined", value=f"<t:{int(user.joined_at.timestamp())}:F>" if user.joined_at else "N/A")
+            if user.roles:
+                e.add_field(name="Roles", value=", ".join(r.mention for r in user.roles[1:]) or "None", inline=False)
+        await inter.response.send_message(embed=e)
+
+    @app_commands.command(name="say", description="Make the bot say something (mentions disabled).")
+    @app_cmd_check_blacklist()
+    @app_commands.describe(message="What to say")
+    async def slash_say(self, inter:discord.Interaction, message:str):
+        await inter.response.send_message("Sent.", ephemeral=True)
+        await inter.channel.send(message, allowed_mentions=discord.AllowedMentions.none())
+
+    @app_commands.command(name="say_admin", description="Admin say (mentions allowed).")
+    @app_cmd_check_admin()
+    @app_commands.describe(message="What to say (mentions allowed)")
+    async def slash_say_admin(self, inter:discord.Interaction, message:str):
+        await inter.response.send_message("Sent.", ephemeral=True)
+        await inter.channel.send(message)
+
+    @app_commands.command(name="showcommands", description="Interactive menu of commands you can use.")
+    @app_cmd_check_blacklist()
+    async def slash_showcommands(self, inter:discord.Interaction):
+        acc = accessible_commands_for(inter.user)
+        v = ShowCmdsView(inter.user, acc)
+        await inter.response.send_message(embed=AM(0x5865F2, "Tap a category to view commands."), view=v, ephemeral=True)
+
+    # ---- Ask for Command ----
+    @app_commands.command(name="askforcommand", description="Ask owner for a command idea.")
+    @app_cmd_check_blacklist()
+    @app_commands.describe(idea="Describe what command/feature you want")
+    async def slash_askforcommand(self, inter:discord.Interaction, idea:str):
+        # ping owner, DM owner, and log
+        msg = f"**Command Request** from {inter.user.mention} ({inter.user.id}) in **{inter.guild.name}** ({inter.guild.id}):\n> {idea}"
+        try:
+            owner = await resolve_user(OWNER_ID)
+            await owner.send(msg)
+        except: pass
+        await send_log(inter.guild, AM(0x5865F2, "Command Request", msg))
+        await inter.response.send_message("Sent to owner. Thanks!", ephemeral=True)
+
+    # ---- Prefix mirrors ----
+    @commands.command(name="say")
+    async def pc_say(self, ctx:commands.Context, *, message:str):
+        if is_blacklisted(ctx.author): return
+        await ctx.send(message, allowed_mentions=discord.AllowedMentions.none())
+
+    @commands.command(name="say_admin")
+    async def pc_say_admin(self, ctx:commands.Context, *, message:str):
+        if not is_admin(ctx.author):
+            return await ctx.reply("Admin-only.")
+        await ctx.send(message)
+
+async def setup(bot):
+    await bot.add_cog(General(bot))
@@ -0,0 +1,68 @@
+# =========================
+# guild_index.py
+# =========================
+# In-memory index of the guilds this process serves, for /servers. Kept up to date
+# by guild join / remove / update events instead of walking bot.guilds per call.
+import time
+
+SORTS = {
+    "members": lambda e: (-e["members"], e["key"]),
+    "joined":  lambda e: (e["joined"], e["key"]),
+    "name":    lambda e: (e["key"], e["id"]),
+}
+MEMBER_ORDER_TTL = 60     # seconds; member counts move constantly, so that order is rebuilt lazily
+
+class GuildIndex:
+    def __init__(self):
+        self._entries: dict[int, dict] = {}   # guild_id -> {"id", "name", "key", "members", "joined", "shard"}
+        self._orders: dict[str, tuple] = {}   # sort -> (built_at, [guild_id])
+        self.built = False
+
+    def __len__(self):
+        return len(self._entries)
+
+    def rebuild(self, guilds):
+        self._entries.clear()
+        for g in guilds:
+            self._entries[g.id] = self._entry(g)
+        self._orders.clear()
+        self.built = True
+
+    @staticmethod
+    def _entry(g) -> dict:
+        return {"id": g.id, "name": g.name, "key": g.name.casefold(), "members": g.member_count or 0,
+                "joined": g.me.joined_at.timestamp() if g.me and g.me.joined_at else 0.0, "shard": g.shard_id}
+
+    def upsert(self, g):
+        old = self._entries.get(g.id)
+        new = self._entries[g.id] = self._entry(g)
+        if old is None or old["name"] != new["name"]:
+            self._orders.clear()
+        else:
+            self._orders.pop("members", None)
+
+    def remove(self, gid:int):
+        if self._entries.pop(gid, None) is not None:
+            self._orders.clear()
+
+    def bump_members(self, gid:int, delta:int):
+        # join / leave: the count changes, the member order goes stale (rebuilt after MEMBER_ORDER_TTL)
+        e = self._entries.get(gid)
+        if e:
+            e["members"] = max(0, e["members"] + delta)
+
+    def _order(self, sort:str) -> list[int]:
+        cached = self._orders.get(sort)
+        if cached and (sort != "members" or time.monotonic() - cached[0] < MEMBER_ORDER_TTL):
+            return cached[1]
+        ids = [e["id"] for e in sorted(self._entries.values(), key=SORTS[sort])]
+        self._orders[sort] = (time.monotonic(), ids)
+        return ids
+
+    def query(self, sort:str="members", search:str="") -> list[dict]:
+        ids = self._order(sort if sort in SORTS else "members")
+        entries = self._entries
+        if not search:
+            return [entries[i] for i in ids if i in entries]
+        q = search.strip().casefold()
+        return [e for e in (entries.get(i) for i in ids) if e and (q in e["key"] or q in str(e["id"]))]
@@ -0,0 +1,322 @@
+# =========================
+# logs.py
+# =========================
+# Member / message / role event logging, snipes and log channel commands.
+import time, asyncio
+from datetime import datetime
+
+import discord
+from discord.ext import commands
+from discord import app_commands
+
+from core import (AM, send_log, account_age_str, human_timedelta, user_label, get_log_channel_id, set_log_channel_id,
+                  content_cache, cache_message_content, snipes, esnipes, purging, purge_buffer, deleted_entry,
+                  log_bulk_delete, pending_role_logs, consume_expected, raid_state, app_cmd_check_admin, app_cmd_check_blacklist)
+
+ROLE_LOG_WINDOW = 5       # seconds of role updates merged into one entry
+
+class SnipeView(discord.ui.View):
+    def __init__(self, items:list[dict], kind:str):
+        super().__init__(timeout=60)
+        self.items = items
+        self.index = max(0, len(items)-1)  # start at latest
+        self.kind = kind  # "delete" or "edit"
+
+    def build_embed(self):
+        item = self.items[self.index]
+        color = 0xFF5555 if self.kind == "delete" else 0x55AAFF
+        e = AM(color=color, title=f"{'Deleted' if self.kind=='delete' else 'Edited'} message {self.index+1}/{len(self.items)}")
+        e.add_field(name="Author", value=f"{item['author']} ({item['author_id']})", inline=False)
+        e.add_field(name="Channel", value=f"<#{item['channel_id']}>", inline=True)
+        e.add_field(name="Message ID", value=str(item.get("message_id","?")), inline=True)
+        e.add_field(name="When", value=f"<t:{int(item['ts'])}:R>", inline=True)
+        if self.kind == "edit":
+            e.add_field(name="Before", value=item.get("before","(empty)")[:1024], inline=False)
+            e.add_field(name="After",  value=item.get("after","(empty)")[:1024], inline=False)
+        else:
+            e.add_field(name="Content", value=item.get("content","(empty)")[:1024], inline=False)
+        if att := item.get("attachment"):
+            e.add_field(name="Attachment", value=att, inline=False)
+        if del_by := item.get("deleted_by"):
+            e.add_field(name="Deleted by", value=del_by, inline=False)
+        return e
+
+    @discord.ui.button(label="⬅️", style=discord.ButtonStyle.secondary)
+    async def prev(self, interaction:discord.Interaction, button:discord.ui.Button):
+        if interaction.user is None: return
+        self.index = max(0, self.index-1)
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+    @discord.ui.button(label="➡️", style=discord.ButtonStyle.secondary)
+    async def next(self, interaction:discord.Interaction, button:discord.ui.Button):
+        if interaction.user is None: return
+        self.index = min(len(self.items)-1, self.index+1)
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+class Logs(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    # ---- Content cache (feeds snipes / delete + edit logs) ----
+    @commands.Cog.listener()
+    async def on_message(self, message:discord.Message):
+        if message.guild and not message.author.bot:
+            cache_message_content(message)
+
+    # ---- Member join / leave ----
+    @commands.Cog.listener()
+    async def on_member_join(self, member:discord.Member):
+        if member.guild.id in raid_state:
+            return  # raid mode: joins are summarized when it ends instead of logged one by one
+        e = AM(0x00CC88, "Member Joined")
+        e.set_author(name=str(member), icon_url=getattr(member.display_avatar, "url", discord.Embed.Empty))
+        e.add_field(name="User", value=f"{member.mention}\n{member} ({member.id})", inline=False)
+        e.add_field(name="Account Age", value=account_age_str(member), inline=True)
+        e.add_field(name="Member Count", value=str(member.guild.member_count), inline=True)
+        e.add_field(name="Joined", value=f"<t:{int(member.joined_at.timestamp())}:F>" if member.joined_at else "N/A", inline=False)
+        await send_log(member.guild, e)
+
+    @commands.Cog.listener()
+    async def on_raw_member_remove(self, payload:discord.RawMemberRemoveEvent):
+        # raw: with MEMBER_CACHE=lean/none most leavers were never cached, so on_member_remove wouldn't fire
+        guild = self.bot.get_guild(payload.guild_id)
+        if not guild:
+            return
+        member = payload.user   # a Member if it was cached, else a plain User
+        joined_at = getattr(member, "joined_at", None)
+        e = AM(0xCC0000, "Member Left")
+        e.set_author(name=str(member), icon_url=getattr(member.display_avatar, "url", discord.Embed.Empty))
+        e.add_field(name="User", value=f"{member} ({member.id})", inline=False)
+        e.add_field(name="Account Age", value=account_age_str(member), inline=True)
+        e.add_field(name="Time in Server", value="N/A" if not joined_at else f"{human_timedelta((datetime.utcnow()-joined_at.replace(tzinfo=None)).total_seconds())}", inline=True)
+        e.add_field(name="Member Count", value=str(guild.member_count), inline=True)
+        await send_log(guild, e)
+
+    # ---- Role changes: coalesced per member over a short window ----
+    async def flush_role_log(self, guild:discord.Guild, uid:int):
+        await asyncio.sleep(ROLE_LOG_WINDOW)
+        p = pending_role_logs.pop((guild.id, uid), None)
+        if not p or not (p["added"] or p["removed"]):
+            return
+        member = guild.get_member(uid)
+        e = AM(0x3388FF, "Roles Changed")
+        e.add_field(name="User", value=f"{member or user_label(guild, uid)} ({uid})", inline=False)
+        if p["added"]:
+            e.add_field(name="Added", value=", ".join(f"<@&{rid}>" for rid in p["added"])[:1024], inline=False)
+        if p["removed"]:
+            names = [(guild.get_role(rid).name if guild.get_role(rid) else str(rid)) for rid in p["removed"]]
+            e.add_field(name="Removed", value=", ".join(names)[:1024], inline=False)
+        if member:
+            e.add_field(name="Account Age", value=account_age_str(member), inline=True)
+        await send_log(guild, e)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before:discord.Member, after:discord.Member):
+        # roles added / removed
+        b = {r.id for r in before.roles}
+        a = {r.id for r in after.roles}
+        gid = after.guild.id
+        added = {r for r in a - b if not consume_expected(gid, after.id, r)}
+        removed = {r for r in b - a if not consume_expected(gid, after.id, r)}
+        if not added and not removed:
+            return
+        key = (gid, after.id)
+        p = pending_role_logs.get(key)
+        if p is None:
+            p = pending_role_logs[key] = {"added": set(), "removed": set()}
+            asyncio.create_task(self.flush_role_log(after.guild, after.id))
+        # net change: add-then-remove inside the window cancels out
+        for r in added:
+            if r in p["removed"]: p["removed"].discard(r)
+            else: p["added"].add(r)
+        for r in removed:
+            if r in p["added"]: p["added"].discard(r)
+            else: p["removed"].add(r)
+
+    @commands.Cog.listener()
+    async def on_member_ban(self, guild:discord.Guild, user:discord.User):
+        e = AM(0x990000, "User Banned")
+        e.add_field(name="User", value=f"{user} ({user.id})", inline=False)
+        e.add_field(name="Account Age", value=account_age_str(user), inline=True)
+        await send_log(guild, e)
+
+    @commands.Cog.listener()
+    async def on_member_unban(self, guild:discord.Guild, user:discord.User):
+        e = AM(0x33AA33, "User Unbanned")
+        e.add_field(name="User", value=f"{user} ({user.id})", inline=False)
+        await send_log(guild, e)
+
+    # ---- Message deletes / edits ----
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload:discord.RawMessageDeleteEvent):
+        if not payload.guild_id:
+            return
+        guild = self.bot.get_guild(payload.guild_id)
+        entry = content_cache.pop(payload.message_id)
+        msg = payload.cached_message
+        if not guild or (msg and msg.author.bot):
+            return
+        buf = purge_buffer(payload.channel_id, payload.message_id)
+        if buf is not None:
+            # part of a purge: summarized once when it finishes, no snipe
+            buf.append(deleted_entry(payload.message_id, msg, entry))
+            return
+        if msg:
+            author_id, content = msg.author.id, msg.content or ""
+            att = msg.attachments[0].url if msg.attachments else None
+        elif entry:
+            author_id, _, content, att = entry
+        else:
+            return  # never saw this message; nothing to snipe or log
+        author = str(msg.author) if msg else user_label(guild, author_id)
+        snipes[payload.channel_id].append({
+            "author": author,
+            "author_id": author_id,
+            "channel_id": payload.channel_id,
+            "content": content,
+            "attachment": att,
+            "message_id": payload.message_id,
+            "ts": time.time(),
+            "deleted_by": None  # unknown unless audit logs; skip to avoid rate limits
+        })
+        created = discord.utils.snowflake_time(payload.message_id)
+        e = AM(0xCC4444, "Message Deleted")
+        e.add_field(name="User", value=f"{author} ({author_id})", inline=False)
+        e.add_field(name="Channel", value=f"<#{payload.channel_id}>", inline=True)
+        e.add_field(name="Message ID", value=str(payload.message_id), inline=True)
+        e.add_field(name="Age", value=f"{human_timedelta(time.time()-created.timestamp())}", inline=True)
+        if content:
+            e.add_field(name="Content", value=content[:1000], inline=False)
+        if att:
+            e.add_field(name="Attachment", value=att, inline=False)
+        await send_log(guild, e)
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload:discord.RawMessageUpdateEvent):
+        # unfurls, pins, thread/flag updates also arrive as MESSAGE_UPDATE; only user edits bump edited_timestamp
+        if not payload.guild_id or "content" not in payload.data or not payload.data.get("edited_timestamp"):
+            return
+        author_data = payload.data.get("author") or {}
+        if author_data.get("bot"):
+            return
+        guild = self.bot.get_guild(payload.guild_id)
+        if not guild:
+            return
+        after = payload.data.get("content") or ""
+        if payload.cached_message:
+            before, author_id = payload.cached_message.content or "", payload.cached_message.author.id
+        else:
+            entry = content_cache.get(payload.message_id)
+            before = entry[2] if entry else None
+            author_id = entry[0] if entry else int(author_data.get("id", 0))
+        content_cache.update_content(payload.message_id, after)
+        if before == after:
+            return
+        author = user_label(guild, author_id)
+        if before is not None:
+            esnipes[payload.channel_id].append({
+                "author": author,
+                "author_id": author_id,
+                "channel_id": payload.channel_id,
+                "before": before,
+                "after":  after,
+                "message_id": payload.message_id,
+                "ts": time.time()
+            })
+        e = AM(0x4488CC, "Message Edited")
+        e.add_field(name="User", value=f"{author} ({author_id})", inline=False)
+        e.add_field(name="Channel", value=f"<#{payload.channel_id}>", inline=True)
+        e.add_field(name="Message ID", value=str(payload.message_id), inline=True)
+        e.add_field(name="Before", value=((before or "(empty)") if before is not None else "(not cached)")[:800], inline=False)
+        e.add_field(name="After",  value=(after  or "(empty)")[:800], inline=False)
+        await send_log(guild, e)
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload:discord.RawBulkMessageDeleteEvent):
+        if not payload.guild_id:
+            return
+        guild = self.bot.get_guild(payload.guild_id)
+        if not guild:
+            return
+        cached = {m.id: m for m in payload.cached_messages}
+        entries = []
+        for mid in payload.message_ids:
+            msg = cached.get(mid)
+            entry = content_cache.pop(mid)
+            if msg and msg.author.bot:
+                continue
+            entries.append(deleted_entry(mid, msg, entry))
+        if payload.channel_id in purging:
+            for x in entries:
+                purge_buffer(payload.channel_id, x[0]).append(x)
+        elif entries:
+            await log_bulk_delete(guild, payload.channel_id, entries)
+
+    # ---- Log channel ----
+    @app_commands.command(name="set_log_channel", description="Admin: Set log channel here (or specify).")
+    @app_cmd_check_admin()
+    @app_commands.describe(channel="Channel (optional)")
+    async def slash_set_log(self, inter:discord.Interaction, channel:discord.TextChannel=None):
+        channel = channel or inter.channel
+        set_log_channel_id(inter.guild.id, channel.id)
+        await inter.response.send_message(f"Log channel set to {channel.mention}")
+
+    @app_commands.command(name="disable_log_channel", description="Admin: disable logs.")
+    @app_cmd_check_admin()
+    async def slash_disable_log(self, inter:discord.Interaction):
+        set_log_channel_id(inter.guild.id, None)
+        await inter.response.send_message("Logs disabled for this server.")
+
+    @app_commands.command(name="check_log_channel", description="Check current log channel.")
+    @app_cmd_check_blacklist()
+    async def slash_check_log(self, inter:discord.Interaction):
+        cid = get_log_channel_id(inter.guild.id)
+        if not cid:
+            await inter.response.send_message("No log channel set.")
+        else:
+            await inter.response.send_message(f"Log channel: <#{cid}>")
+
+    @app_commands.command(name="logs", description="Show recent logs (count).")
+    @app_cmd_check_admin()
+    @app_commands.describe(count="How many last events (1-50)")
+    async def slash_logs(self, inter:discord.Interaction, count:int=10):
+        count = max(1, min(50, count))
+        # We don't store a separate log DB; this command just pings the log channel with a pointer.
+        cid = get_log_channel_id(inter.guild.id)
+        if not cid:
+            await inter.response.send_message("Log channel not set.", ephemeral=True)
+            return
+        await inter.response.send_message(f"Check the last ~{count} events in <#{cid}>.\n(Events are posted live; use channel history.)", ephemeral=True)
+
+    @app_commands.command(name="log", description="Admin: Show logs related to a specific user (guide).")
+    @app_cmd_check_admin()
+    @app_commands.describe(user="Target user")
+    async def slash_log(self, inter:discord.Interaction, user:discord.User):
+        # Guidance embed (we already send detailed logs as events happen)
+        e = AM(0x2B2D31, "Log Lookup")
+        e.description = f"Search your log channel for:\n- `{user.id}`\n- Mentions of {user.mention}\n- Message IDs\n\n(Full per-user archival DB would be heavy; current logs contain: user ID, account age, content, message/channel IDs, action type, and time.)"
+        await inter.response.send_message(embed=e, ephemeral=True)
+
+    # ---- Snipe / Esnipe ----
+    @app_commands.command(name="snipe", description="Show recently deleted messages in this channel.")
+    @app_cmd_check_blacklist()
+    async def slash_snipe(self, inter:discord.Interaction):
+        items = list(snipes.get(inter.channel.id, []))
+        if not items:
+            await inter.response.send_message("Nothing to snipe.", ephemeral=True)
+            return
+        v = SnipeView(items, "delete")
+        await inter.response.send_message(embed=v.build_embed(), view=v)
+
+    @app_commands.command(name="esnipe", description="Show recently edited messages in this channel.")
+    @app_cmd_check_blacklist()
+    async def slash_esnipe(self, inter:discord.Interaction):
+        items = list(esnipes.get(inter.channel.id, []))
+        if not items:
+            await inter.response.send_message("Nothing to e-snipe.", ephemeral=True)
+            return
+        v = SnipeView(items, "edit")
+        await inter.response.send_message(embed=v.build_embed(), view=v)
+
+async def setup(bot):
+    await bot.add_cog(Logs(bot))
@@ -0,0 +1,45 @@
+# =========================
+# message_cache.py
+# =========================
+# Content-only LRU for snipes / delete+edit logs. Much smaller than keeping
+# full discord.Message objects around, so far more history fits.
+from collections import OrderedDict
+
+ENTRY_OVERHEAD = 160      # rough bytes per entry (tuple, ints, dict slot) on top of the text
+
+class ContentCache:
+    # message_id -> (author_id, channel_id, content, attachment_url)
+    def __init__(self, max_bytes:int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._items: "OrderedDict[int, tuple]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    @staticmethod
+    def _size(entry:tuple) -> int:
+        return ENTRY_OVERHEAD + len(entry[2].encode()) + len(entry[3] or "")
+
+    def put(self, message_id:int, author_id:int, channel_id:int, content:str, attachment:str|None=None):
+        self.pop(message_id)
+        entry = (author_id, channel_id, content or "", attachment)
+        self._items[message_id] = entry
+        self.bytes += self._size(entry)
+        while self.bytes > self.max_bytes and self._items:
+            _, old = self._items.popitem(last=False)
+            self.bytes -= self._size(old)
+
+    def get(self, message_id:int) -> tuple|None:
+        return self._items.get(message_id)
+
+    def pop(self, message_id:int) -> tuple|None:
+        entry = self._items.pop(message_id, None)
+        if entry:
+            self.bytes -= self._size(entry)
+        return entry
+
+    def update_content(self, message_id:int, content:str):
+        entry = self._items.get(message_id)
+        if entry:
+            self.put(message_id, entry[0], entry[1], content, entry[3])
@@ -0,0 +1,657 @@
+# =========================
+# moderation.py
+# =========================
+# Purge, ban/kick/timeout, mass actions, channel locks, raid mode and roles.
+import re, time, asyncio
+from collections import defaultdict
+from datetime import datetime, timedelta
+from concurrent.futures.process import BrokenProcessPool
+
+import discord
+from discord.ext import commands
+from discord import app_commands
+
+import regex_sandbox
+from outbound import scheduler, MOD
+from raid_detector import JoinRate
+from core import (data, save_data, AM, send_log, snowflake_age, is_admin, is_trusted, purge_scope, expect_role_change,
+                  consume_expected, set_channel_lock, owns_guild, ensure_chunked, resolve_user, resolve_member, join_rates, raid_state,
+                  MEMBER_CACHE, DEFAULT_TIMEOUT_SECS, app_cmd_check_admin)
+
+# ---- Purge engine: streams history, filters, bulk-deletes <14d, single-deletes older ----
+PURGE_MAX = 10000         # messages deleted per run
+PURGE_SCAN_MAX = 50000    # messages scanned per run
+PURGE_OLD_DELAY = 1.1     # seconds between single deletes (older than 14 days)
+PURGE_PROGRESS_EVERY = 3  # seconds between progress edits
+PURGE_PATTERN_BATCH = 200 # messages per regex sandbox round-trip
+
+async def run_purge(channel:discord.abc.Messageable, amount:int, check=None, *, pattern:str|None=None,
+                    actor:discord.abc.User|None=None, after:datetime|None=None, before=None, progress=None) -> dict:
+    # `pattern` (user-supplied regex) is matched in the regex sandbox in batches, never on the loop
+    stats = {"scanned": 0, "matched": 0, "deleted": 0, "failed": 0}
+    g = getattr(channel, "guild", None)
+    bucket, gid = ("ch", channel.id), g and g.id   # deletes go through the scheduler at MOD priority
+    bulk_ids: list[int] = []
+    old_ids: list[int] = []
+    pending: list[discord.Message] = []   # passed `check`, waiting for the next pattern batch
+    last_report = 0.0
+    async def report(stage:str, force:bool=False):
+        nonlocal last_report
+        if progress and (force or time.time() - last_report >= PURGE_PROGRESS_EVERY):
+            last_report = time.time()
+            try: await progress(stage, stats)
+            except: pass
+    async def flush_bulk():
+        ids = bulk_ids[:]
+        bulk_ids.clear()
+        scope.claim(ids)
+        try:
+            if len(ids) == 1:
+                await scheduler.run(MOD, bucket, lambda: channel.get_partial_message(ids[0]).delete(), guild=gid)
+            elif ids:
+                await scheduler.run(MOD, bucket, lambda: channel.delete_messages([discord.Object(id=i) for i in ids]), guild=gid)
+            stats["deleted"] += len(ids)
+        except:
+            stats["failed"] += len(ids)
+    # bulk delete only accepts messages younger than 14 days (minus a safety margin)
+    bulk_cutoff = discord.utils.utcnow() - timedelta(days=14) + timedelta(minutes=5)
+    async def take(msgs:list[discord.Message]) -> bool:
+        # True once `amount` is reached
+        for msg in msgs:
+            stats["matched"] += 1
+            (bulk_ids if msg.created_at > bulk_cutoff else old_ids).append(msg.id)
+            if len(bulk_ids) >= 100:
+                await flush_bulk()
+                await report("bulk deleting")
+            if stats["matched"] >= amount:
+                return True
+        return False
+    async def take_pending() -> bool:
+        batch = pending[:]
+        pending.clear()
+        try:
+            hits = await regex_sandbox.match_many(pattern, [m.content or "" for m in batch])
+        except (asyncio.TimeoutError, BrokenProcessPool):
+            stats["aborted"] = "pattern too slow on this channel's messages"
+            return True
+        return await take([m for m, hit in zip(batch, hits) if hit])
+    async with purge_scope(channel, actor) as scope:
+        done = False
+        async for msg in channel.history(limit=PURGE_SCAN_MAX, before=before, after=after, oldest_first=False):
+            stats["scanned"] += 1
+            if check and not check(msg):
+                if stats["scanned"] % 500 == 0: await report("scanning")
+                continue
+            if pattern:
+                pending.append(msg)
+                if len(pending) >= PURGE_PATTERN_BATCH:
+                    done = await take_pending()
+                    await report("scanning")
+            else:
+                done = await take([msg])
+            if done:
+                break
+        if pending and not done:
+            await take_pending()
+        await flush_bulk()
+        scope.claim(old_ids)
+        for i, mid in enumerate(old_ids):
+            try:
+                await scheduler.run(MOD, bucket, lambda: channel.get_partial_message(mid).delete(), guild=gid)
+                stats["deleted"] += 1
+            except:
+                stats["failed"] += 1
+            await report(f"deleting old messages ({i+1}/{len(old_ids)})")
+            await asyncio.sleep(PURGE_OLD_DELAY)
+    await report("done", force=True)
+    return stats
+
+def purge_filter(user:discord.abc.User|None=None, attachments_only:bool=False, bots_only:bool=False):
+    # cheap in-loop checks only; a regex goes to run_purge(pattern=...)
+    def check(m:discord.Message) -> bool:
+        if user and m.author.id != user.id: return False
+        if bots_only and not m.author.bot: return False
+        if attachments_only and not m.attachments: return False
+        return True
+    if not (user or attachments_only or bots_only):
+        return None
+    return check
+
+def purge_summary(stats:dict) -> str:
+    s = f"Deleted {stats['deleted']} messages (scanned {stats['scanned']}, matched {stats['matched']})."
+    if stats["failed"]:
+        s += f" {stats['failed']} could not be deleted."
+    if stats.get("aborted"):
+        s += f" Stopped early: {stats['aborted']}."
+    return s
+
+# ---- Mass moderation (rate-limit-aware work queue on top of the outbound scheduler) ----
+MASS_MAX_TARGETS = 500
+MOD_RETRIES = 4
+_TARGET_ID_RE = re.compile(r"\d{15,21}")
+
+def parse_targets(text:str|None) -> list[int]:
+    # IDs or mentions separated by anything; order kept, duplicates dropped
+    return list(dict.fromkeys(int(x) for x in _TARGET_ID_RE.findall(text or "")))
+
+class ModQueue:
+    # one action over many targets: every call goes through the outbound scheduler at MOD
+    # priority (which owns concurrency per bucket / guild), 429/5xx retries, targets deduplicated
+    # across every job in flight so overlapping mass commands don't double up
+    def __init__(self):
+        self.inflight: set[tuple[int, str, int]] = set()   # (guild_id, action, target_id)
+
+    async def run(self, guild:discord.Guild, action:str, targets:list[int], fn, progress=None, bucket=None) -> dict:
+        # bucket: target id -> rate-limit bucket; guild-wide unless given (e.g. per channel)
+        bucket = bucket or (lambda uid: ("guild", guild.id))
+        res = {"ok": [], "failed": [], "skipped": []}
+        done = 0
+        async def one(uid:int):
+            nonlocal done
+            key = (guild.id, action, uid)
+            if key in self.inflight:
+                res["skipped"].append(uid)
+            else:
+                self.inflight.add(key)
+                try:
+                    await self._attempt(guild.id, bucket(uid), uid, fn, res)
+                finally:
+                    self.inflight.discard(key)
+            done += 1
+            if progress:
+                try: await progress(done, len(targets), res)
+                except: pass
+        await asyncio.gather(*(one(u) for u in targets))
+        return res
+
+    async def _attempt(self, gid:int, bucket, uid:int, fn, res:dict):
+        for attempt in range(MOD_RETRIES):
+            try:
+                await scheduler.run(MOD, bucket, lambda: fn(uid), guild=gid)
+                res["ok"].append(uid)
+                return
+            except discord.RateLimited as e:
+                wait = e.retry_after
+            except discord.HTTPException as e:
+                if e.status == 429 or e.status >= 500:
+                    wait = getattr(e, "retry_after", None) or 2 ** attempt
+                else:
+                    res["failed"].append((uid, e.text or str(e)))
+                    return
+            except Exception as e:
+                res["failed"].append((uid, str(e)))
+                return
+            if attempt < MOD_RETRIES - 1:
+                await asyncio.sleep(wait)   # back off here, not in a scheduler worker
+        res["failed"].append((uid, "rate limited"))
+
+mod_queue = ModQueue()
+
+def protected_target(guild:discord.Guild, uid:int, actor:discord.abc.User) -> bool:
+    u = discord.Object(id=uid)
+    return uid in (actor.id, guild.me.id, guild.owner_id) or is_admin(u) or is_trusted(u)
+
+async def run_mass_action(guild:discord.Guild, actor:discord.abc.User, action:str, targets:list[int], reason:str,
+                          duration:int|None=None, progress=None) -> dict:
+    reason = f"{reason} | mass {action} by {actor}"
+    async def act(uid:int):
+        if action == "ban":
+            await guild.ban(discord.Object(id=uid), reason=reason, delete_message_seconds=0)
+        elif action == "kick":
+            await guild.kick(discord.Object(id=uid), reason=reason)
+        elif action == "timeout":
+            member = await resolve_member(guild, uid)
+            await member.timeout(discord.utils.utcnow() + timedelta(seconds=duration or DEFAULT_TIMEOUT_SECS), reason=reason)
+    protected = [u for u in targets if protected_target(guild, u, actor)]
+    targets = [u for u in targets if u not in protected][:MASS_MAX_TARGETS]
+    res = await mod_queue.run(guild, action, targets, act, progress)
+    res["skipped"] += protected
+    e = AM(0x990000, f"Mass {action.title()}")
+    e.add_field(name="By", value=f"{actor} ({actor.id})", inline=False)
+    e.add_field(name="Result", value=f"{len(res['ok'])} ok / {len(res['failed'])} failed / {len(res['skipped'])} skipped", inline=False)
+    e.add_field(name="Reason", value=reason[:1000], inline=False)
+    await send_log(guild, e)
+    return res
+
+def mass_summary(action:str, res:dict) -> discord.Embed:
+    e = AM(0x990000, f"Mass {action}: {len(res['ok'])} done")
+    if res["failed"]:
+        e.add_field(name=f"Failed ({len(res['failed'])})", value="\n".join(f"`{u}`: {why[:80]}" for u, why in res["failed"][:15]), inline=False)
+    if res["skipped"]:
+        e.add_field(name=f"Skipped ({len(res['skipped'])})", value="Protected users or already queued.", inline=False)
+    return e
+
+async def recent_joiners(guild:discord.Guild, minutes:int) -> list[int]:
+    cutoff = discord.utils.utcnow() - timedelta(minutes=minutes)
+    if MEMBER_CACHE == "none":
+        return [m.id async for m in guild.fetch_members(limit=None) if m.joined_at and m.joined_at >= cutoff and not m.bot]
+    await ensure_chunked(guild)
+    return [m.id for m in guild.members if m.joined_at and m.joined_at >= cutoff and not m.bot]
+
+async def mass_command(inter:discord.Interaction, action:str, targets:str|None, joined_within_minutes:int|None, reason:str, duration:int|None=None):
+    await inter.response.defer(ephemeral=True)  # may need to chunk the guild first
+    ids = parse_targets(targets)
+    if joined_within_minutes:
+        ids = list(dict.fromkeys(ids + await recent_joiners(inter.guild, joined_within_minutes)))
+    if not ids:
+        await inter.edit_original_response(content="No targets. Pass IDs/mentions or joined_within_minutes.")
+        return
+    if len(ids) > MASS_MAX_TARGETS:
+        await inter.edit_original_response(content=f"Too many targets ({len(ids)}); max {MASS_MAX_TARGETS}.")
+        return
+    last = 0.0
+    async def progress(done:int, total:int, res:dict):
+        nonlocal last
+        if time.time() - last >= 2 or done == total:
+            last = time.time()
+            await inter.edit_original_response(content=f"Mass {action}: {done}/{total} processed ({len(res['ok'])} ok, {len(res['failed'])} failed)")
+    res = await run_mass_action(inter.guild, inter.user, action, ids, reason, duration, progress)
+    await inter.edit_original_response(content=None, embed=mass_summary(action, res))
+
+# ---- Raid detection (join-rate window + account-age buckets) ----
+RAID_DEFAULTS = {
+    "enabled": False,         # opt-in via /raid_config: detection locks channels on its own
+    "window": 30,             # seconds
+    "joins": 15,              # any joins in window
+    "new_account_days": 7,
+    "new_joins": 8,           # joins from accounts younger than new_account_days
+    "action": "lock",         # lock / timeout / both
+    "duration": 3600,         # timeout seconds for new accounts during raid mode
+    "minutes": 10             # raid mode length
+}
+
+def raid_cfg(gid:int) -> dict:
+    cfg = dict(RAID_DEFAULTS)
+    cfg.update(data.get("raid_policy", {}).get(str(gid), {}))
+    return cfg
+
+def account_age_days(uid:int) -> float:
+    created = snowflake_age(uid)
+    return (datetime.utcnow() - created).total_seconds() / 86400 if created else 1e9
+
+def check_raid(member:discord.Member) -> bool:
+    # O(1) per join; returns True while the guild is in raid mode
+    g = member.guild
+    cfg = raid_cfg(g.id)
+    if not cfg["enabled"]:
+        return False
+    now = time.time()
+    age = account_age_days(member.id)
+    jr = join_rates.get(g.id)
+    if jr is None or jr.window != cfg["window"]:
+        jr = join_rates[g.id] = JoinRate(cfg["window"])
+    jr.add(now, age)
+    st = raid_state.get(g.id)
+    if st is None:
+        total, fresh = jr.count(now), jr.count(now, cfg["new_account_days"])
+        if total < cfg["joins"] and fresh < cfg["new_joins"]:
+            return False
+        st = start_raid_mode(g, cfg, f"{total} joins ({fresh} new accounts) in {cfg['window']}s")
+    st["joins"] += 1
+    if cfg["action"] in ("timeout", "both") and age < cfg["new_account_days"]:
+        st["timed_out"] += 1
+        asyncio.create_task(raid_timeout(member, cfg["duration"]))
+    return True
+
+async def raid_timeout(member:discord.Member, duration:int):
+    until = discord.utils.utcnow() + timedelta(seconds=duration)
+    try: await scheduler.run(MOD, ("guild", member.guild.id), lambda: member.timeout(until, reason="Raid mode: new account"))
+    except: pass
+
+def start_raid_mode(guild:discord.Guild, cfg:dict, why:str, actor:discord.abc.User|None=None) -> dict:
+    st = raid_state[guild.id] = {"until": time.time() + cfg["minutes"]*60, "locked": [], "joins": 0, "timed_out": 0}
+    st["task"] = asyncio.create_task(raid_mode_task(guild, cfg, st, why, actor))
+    return st
+
+async def raid_mode_task(guild:discord.Guild, cfg:dict, st:dict, why:str, actor):
+    e = AM(0xFF0000, "🚨 Raid Mode Enabled")
+    e.add_field(name="Trigger", value=f"Manual by {actor}" if actor else why, inline=False)
+    e.add_field(name="Action", value=f"{cfg['action']} for {cfg['minutes']}m", inline=True)
+    await send_log(guild, e)
+    try:
+        if cfg["action"] in ("lock", "both"):
+            everyone = guild.default_role
+            targets = [c.id for c in guild.text_channels if c.permissions_for(everyone).send_messages]
+            async def lock(cid:int):
+                await set_channel_lock(guild.get_channel(cid), True, "Raid mode")
+                st["locked"].append(cid)
+            await mod_queue.run(guild, "raid_lock", targets, lock, bucket=lambda cid: ("ch", cid))
+        await asyncio.sleep(max(0, st["until"] - time.time()))
+    except asyncio.CancelledError:
+        pass  # /raidmode off
+    await end_raid_mode(guild, st, st.get("ended_by"))
+
+async def end_raid_mode(guild:discord.Guild, st:dict, actor:discord.abc.User|None=None):
+    if raid_state.get(guild.id) is st:
+        raid_state.pop(guild.id, None)
+    async def unlock(cid:int):
+        ch = guild.get_channel(cid)
+        if ch: await set_channel_lock(ch, False, "Raid mode ended")
+    await mod_queue.run(guild, "raid_unlock", st["locked"], unlock, bucket=lambda cid: ("ch", cid))
+    e = AM(0x33AA33, "Raid Mode Ended")
+    if actor:
+        e.add_field(name="By", value=f"{actor} ({actor.id})", inline=False)
+    e.add_field(name="Joins during raid", value=str(st["joins"]), inline=True)
+    e.add_field(name="Timed out", value=str(st["timed_out"]), inline=True)
+    e.add_field(name="Channels unlocked", value=str(len(st["locked"])), inline=True)
+    await send_log(guild, e)
+
+class Moderation(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.temp_role_task: asyncio.Task | None = None
+
+    async def cog_load(self):
+        self.temp_role_task = asyncio.create_task(self.temp_role_worker())
+
+    async def cog_unload(self):
+        if self.temp_role_task:
+            self.temp_role_task.cancel()
+
+    # ---- Temp role housekeeping ----
+    async def temp_role_worker(self):
+        bot = self.bot
+        await bot.wait_until_ready()
+        while not bot.is_closed():
+            now = datetime.utcnow().isoformat()
+            changed = False
+            remaining = []
+            expired = defaultdict(list)   # guild -> [(member, role)]; one log summary per guild per sweep
+            for tr in data.get("temp_roles", []):
+                try:
+                    exp = datetime.fromisoformat(tr["expires"])
+                    if datetime.utcnow() >= exp:
+                        g = bot.get_guild(int(tr["guild_id"]))
+                        if not g and not owns_guild(int(tr["guild_id"])):
+                            remaining.append(tr)  # another cluster process handles it
+                            continue
+                        if g:
+                            mem = await resolve_member(g, int(tr["user_id"]))
+                            role = g.get_role(int(tr["role_id"]))
+                            if mem and role:
+                                expect_role_change(g.id, mem.id, role.id)
+                                try:
+                                    await mem.remove_roles(role, reason="Temp role expired")
+                                    expired[g].append((mem, role))
+                                except:
+                                    consume_expected(g.id, mem.id, role.id)   # nothing changed; don't hide a later real edit
+                        changed = True
+                    else:
+                        remaining.append(tr)
+                except:
+                    # keep if malformed? safer to drop
+                    changed = True
+            if changed:
+                data["temp_roles"] = remaining
+                save_data(data)
+            for g, items in expired.items():
+                e = AM(0xFF8833, "Temp Roles Expired")
+                e.description = "\n".join(f"{m.mention}: {r.name}" for m, r in items)[:4000]
+                e.add_field(name="Count", value=str(len(items)), inline=True)
+                await send_log(g, e)
+            await asyncio.sleep(30)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member:discord.Member):
+        # runs before the join log (this extension loads first) so raid joins aren't logged one by one
+        check_raid(member)
+
+    # ---- Purge ----
+    @app_commands.command(name="purge", description="Delete messages, with optional filters.")
+    @app_cmd_check_admin()
+    @app_commands.describe(amount=f"How many to delete (1-{PURGE_MAX})", user="Only this user's messages", pattern="Only messages matching this regex",
+                           attachments_only="Only messages with attachments", bots_only="Only bot messages",
+                           newer_than_minutes="Only messages from the last N minutes", older_than_minutes="Only messages older than N minutes")
+    async def slash_purge(self, inter:discord.Interaction, amount:int, user:discord.User=None, pattern:str=None, attachments_only:bool=False,
+                          bots_only:bool=False, newer_than_minutes:int=None, older_than_minutes:int=None):
+        if amount < 1 or amount > PURGE_MAX:
+            await inter.response.send_message(f"Choose between 1 and {PURGE_MAX}.", ephemeral=True)
+            return
+        await inter.response.defer(ephemeral=True)
+        if pattern:
+            err = await regex_sandbox.validate_pattern(pattern)
+            if err:
+                await inter.followup.send(f"Bad pattern: {err}", ephemeral=True)
+                return
+        now = discord.utils.utcnow()
+        after = now - timedelta(minutes=newer_than_minutes) if newer_than_minutes else None
+        before = now - timedelta(minutes=older_than_minutes) if older_than_minutes else None
+        async def progress(stage:str, st:dict):
+            await inter.edit_original_response(content=f"Purging… {stage}: deleted {st['deleted']}, scanned {st['scanned']}")
+        stats = await run_purge(inter.channel, amount, purge_filter(user, attachments_only, bots_only), pattern=pattern or None,
+                                actor=inter.user, after=after, before=before, progress=progress)
+        try:
+            await inter.edit_original_response(content=purge_summary(stats))
+        except discord.HTTPException:
+            # long purges of old messages outlive the 15 minute interaction token
+            try:
+                await inter.channel.send(f"{inter.user.mention} {purge_summary(stats)}", allowed_mentions=discord.AllowedMentions(users=[inter.user]))
+            except discord.HTTPException:
+                await send_log(inter.guild, AM(0xFF5555, "Purge finished", f"{inter.channel.mention} by {inter.user.mention}: {purge_summary(stats)}"))
+
+    # ---- Ban / kick / timeout ----
+    @app_commands.command(name="ban", description="Ban a member (slash requires the member be in server).")
+    @app_cmd_check_admin()
+    @app_commands.describe(member="Member to ban", reason="Reason")
+    async def slash_ban(self, inter:discord.Interaction, member:discord.Member, reason:str="No reason"):
+        try:
+            await member.ban(reason=f"{reason} | by {inter.user}")
+            await inter.response.send_message(f"Banned {member} for: {reason}")
+        except Exception as e:
+            await inter.response.send_message(f"Failed: {e}", ephemeral=True)
+
+    @app_commands.command(name="unban", description="Unban by user ID.")
+    @app_cmd_check_admin()
+    @app_commands.describe(user_id="The user's ID")
+    async def slash_unban(self, inter:discord.Interaction, user_id:str):
+        await inter.response.defer(ephemeral=True)
+        try:
+            u = await resolve_user(int(user_id))
+            await inter.guild.unban(u, reason=f"by {inter.user}")
+            await inter.followup.send(f"Unbanned {u}.")
+        except Exception as e:
+            await inter.followup.send(f"Failed: {e}")
+
+    @app_commands.command(name="kick", description="Kick a member.")
+    @app_cmd_check_admin()
+    @app_commands.describe(member="Member to kick", reason="Reason")
+    async def slash_kick(self, inter:discord.Interaction, member:discord.Member, reason:str="No reason"):
+        try:
+            await member.kick(reason=f"{reason} | by {inter.user}")
+            await inter.response.send_message(f"Kicked {member} for: {reason}")
+        except Exception as e:
+            await inter.response.send_message(f"Failed: {e}", ephemeral=True)
+
+    @app_commands.command(name="timeout", description="Timeout a member.")
+    @app_cmd_check_admin()
+    @app_commands.describe(member="Member", duration_seconds="Seconds", reason="Reason")
+    async def slash_timeout(self, inter:discord.Interaction, member:discord.Member, duration_seconds:int, reason:str="Moderation"):
+        try:
+            until = discord.utils.utcnow() + timedelta(seconds=duration_seconds)
+            await member.timeout(until, reason=f"{reason} | by {inter.user}")
+            await inter.response.send_message(f"Timed out {member} for {duration_seconds}s.")
+        except Exception as e:
+            await inter.response.send_message(f"Failed: {e}", ephemeral=True)
+
+    # ---- Mass actions ----
+    @app_commands.command(name="massban", description="Ban many users by ID/mention or recent join.")
+    @app_cmd_check_admin()
+    @app_commands.describe(targets="IDs or mentions (space/comma separated)", joined_within_minutes="Also target members who joined in the last N minutes", reason="Reason")
+    async def slash_massban(self, inter:discord.Interaction, targets:str=None, joined_within_minutes:int=None, reason:str="Mass ban"):
+        await mass_command(inter, "ban", targets, joined_within_minutes, reason)
+
+    @app_commands.command(name="masskick", description="Kick many members by ID/mention or recent join.")
+    @app_cmd_check_admin()
+    @app_commands.describe(targets="IDs or mentions (space/comma separated)", joined_within_minutes="Also target members who joined in the last N minutes", reason="Reason")
+    async def slash_masskick(self, inter:discord.Interaction, targets:str=None, joined_within_minutes:int=None, reason:str="Mass kick"):
+        await mass_command(inter, "kick", targets, joined_within_minutes, reason)
+
+    @app_commands.command(name="masstimeout", description="Timeout many members by ID/mention or recent join.")
+    @app_cmd_check_admin()
+    @app_commands.describe(duration_seconds="Seconds", targets="IDs or mentions (space/comma separated)", joined_within_minutes="Also target members who joined in the last N minutes", reason="Reason")
+    async def slash_masstimeout(self, inter:discord.Interaction, duration_seconds:int, targets:str=None, joined_within_minutes:int=None, reason:str="Mass timeout"):
+        await mass_command(inter, "timeout", targets, joined_within_minutes, reason, duration_seconds)
+
+    # ---- Lock / unlock ----
+    @app_commands.command(name="lock", description="Lock a channel for @everyone.")
+    @app_cmd_check_admin()
+    @app_commands.describe(channel="Channel (optional)")
+    async def slash_lock(self, inter:discord.Interaction, channel:discord.TextChannel=None):
+        channel = channel or inter.channel
+        await set_channel_lock(channel, True, f"Locked by {inter.user}")
+        await inter.response.send_message(f"Locked {channel.mention}")
+
+    @app_commands.command(name="unlock", description="Unlock a channel.")
+    @app_cmd_check_admin()
+    @app_commands.describe(channel="Channel (optional)")
+    async def slash_unlock(self, inter:discord.Interaction, channel:discord.TextChannel=None):
+        channel = channel or inter.channel
+        await set_channel_lock(channel, False, f"Unlocked by {inter.user}")
+        await inter.response.send_message(f"Unlocked {channel.mention}")
+
+    # ---- Raid mode ----
+    @app_commands.command(name="raidmode", description="Admin: show, start or stop raid mode.")
+    @app_cmd_check_admin()
+    @app_commands.choices(state=[
+        app_commands.Choice(name="status", value="status"),
+        app_commands.Choice(name="on", value="on"),
+        app_commands.Choice(name="off", value="off")
+    ])
+    async def slash_raidmode(self, inter:discord.Interaction, state:app_commands.Choice[str]):
+        st = raid_state.get(inter.guild.id)
+        if state.value == "on":
+            if st:
+                await inter.response.send_message("Raid mode is already on.", ephemeral=True)
+                return
+            start_raid_mode(inter.guild, raid_cfg(inter.guild.id), "manual", inter.user)
+            await inter.response.send_message("Raid mode enabled.")
+        elif state.value == "off":
+            if not st:
+                await inter.response.send_message("Raid mode is not on.", ephemeral=True)
+                return
+            raid_state.pop(inter.guild.id, None)
+            st["ended_by"] = inter.user   # picked up by raid_mode_task for the "Raid Mode Ended" log
+            st["task"].cancel()
+            await inter.response.send_message("Raid mode disabled.")
+        else:
+            jr = join_rates.get(inter.guild.id)
+            cfg = raid_cfg(inter.guild.id)
+            now = time.time()
+            joins = f"{jr.count(now)} joins / {jr.count(now, cfg['new_account_days'])} new in last {cfg['window']}s" if jr else "no recent joins"
+            mode = f"ON until <t:{int(st['until'])}:t> ({st['joins']} joins)" if st else "off"
+            await inter.response.send_message(f"Raid mode: **{mode}**\n{joins}\nConfig: `{cfg}`", ephemeral=True)
+
+    @app_commands.command(name="raid_config", description="Admin: configure raid detection.")
+    @app_cmd_check_admin()
+    @app_commands.describe(enabled="Enable/disable detection", window="Window seconds (5-60)", joins="Joins in window to trigger",
+                           new_account_days="Accounts younger than this count as new", new_joins="New-account joins to trigger",
+                           action="What raid mode does", duration="Timeout seconds for new accounts", minutes="Raid mode length")
+    @app_commands.choices(action=[
+        app_commands.Choice(name="lock", value="lock"),
+        app_commands.Choice(name="timeout", value="timeout"),
+        app_commands.Choice(name="both", value="both")
+    ])
+    async def slash_raid_config(self, inter:discord.Interaction, enabled:bool=None, window:int=None, joins:int=None, new_account_days:int=None,
+                                new_joins:int=None, action:app_commands.Choice[str]=None, duration:int=None, minutes:int=None):
+        cfg = data.setdefault("raid_policy", {}).setdefault(str(inter.guild.id), {})
+        if enabled is not None: cfg["enabled"] = enabled
+        if window is not None: cfg["window"] = max(5, min(60, window))
+        if joins is not None: cfg["joins"] = max(2, joins)
+        if new_account_days is not None: cfg["new_account_days"] = max(1, new_account_days)
+        if new_joins is not None: cfg["new_joins"] = max(2, new_joins)
+        if action is not None: cfg["action"] = action.value
+        if duration is not None: cfg["duration"] = max(60, duration)
+        if minutes is not None: cfg["minutes"] = max(1, minutes)
+        save_data(data)
+        await inter.response.send_message(f"Raid config: `{raid_cfg(inter.guild.id)}`")
+
+    # ---- Roles ----
+    @app_commands.command(name="role_add", description="Add a role to a user.")
+    @app_cmd_check_admin()
+    @app_commands.describe(member="Member", role="Role")
+    async def slash_role_add(self, inter:discord.Interaction, member:discord.Member, role:discord.Role):
+        try:
+            await member.add_roles(role, reason=f"By {inter.user}")
+            await inter.response.send_message(f"Added {role.mention} to {member.mention}")
+        except Exception as e:
+            await inter.response.send_message(f"Failed: {e}", ephemeral=True)
+
+    @app_commands.command(name="role_remove", description="Remove a role from a user.")
+    @app_cmd_check_admin()
+    @app_commands.describe(member="Member", role="Role")
+    async def slash_role_remove(self, inter:discord.Interaction, member:discord.Member, role:discord.Role):
+        try:
+            await member.remove_roles(role, reason=f"By {inter.user}")
+            await inter.response.send_message(f"Removed {role.mention} from {member.mention}")
+        except Exception as e:
+            await inter.response.send_message(f"Failed: {e}", ephemeral=True)
+
+    @app_commands.command(name="role_temp", description="Give a role temporarily.")
+    @app_cmd_check_admin()
+    @app_commands.describe(member="Member", role="Role", duration_minutes="Duration in minutes")
+    async def slash_role_temp(self, inter:discord.Interaction, member:discord.Member, role:discord.Role, duration_minutes:int):
+        try:
+            await member.add_roles(role, reason=f"Temp role by {inter.user}")
+            expires = datetime.utcnow() + timedelta(minutes=duration_minutes)
+            data.setdefault("temp_roles", []).append({
+                "guild_id": str(inter.guild.id),
+                "user_id": str(member.id),
+                "role_id": str(role.id),
+                "expires": expires.isoformat()
+            })
+            save_data(data)
+            await inter.response.send_message(f"Gave {role.mention} to {member.mention} for {duration_minutes}m.")
+        except Exception as e:
+            await inter.response.send_message(f"Failed: {e}", ephemeral=True)
+
+    # ---- Prefix mirrors ----
+    @commands.command(name="ban")
+    async def pc_ban(self, ctx:commands.Context, user:discord.User|None=None, *, reason:str="No reason"):
+        if not is_admin(ctx.author):
+            return
+        if user is None:
+            # allow ID usage: ?ban <id> <reason...>
+            parts = ctx.message.content.split()
+            if len(parts)>=2:
+                try:
+                    uid = int(parts[1].strip("<@!>"))
+                    user = await resolve_user(uid)
+                    reason = " ".join(parts[2:]) if len(parts)>2 else reason
+                except: pass
+        if user:
+            try:
+                await ctx.guild.ban(user, reason=f"{reason} | by {ctx.author}")
+                await ctx.reply(f"Banned {user} for: {reason}")
+            except Exception as e:
+                await ctx.reply(f"Failed: {e}")
+
+    @commands.command(name="massban")
+    async def pc_massban(self, ctx:commands.Context, *, targets:str=""):
+        if not is_admin(ctx.author):
+            return
+        ids = parse_targets(targets)
+        if not ids:
+            return await ctx.reply("Usage: ?massban <ids/mentions...>")
+        status = await ctx.reply(f"Mass ban: 0/{len(ids)} processed")
+        last = 0.0
+        async def progress(done:int, total:int, res:dict):
+            nonlocal last
+            if time.time() - last >= 2 or done == total:
+                last = time.time()
+                await status.edit(content=f"Mass ban: {done}/{total} processed ({len(res['ok'])} ok, {len(res['failed'])} failed)")
+        res = await run_mass_action(ctx.guild, ctx.author, "ban", ids[:MASS_MAX_TARGETS], "Mass ban", progress=progress)
+        await status.edit(content=None, embed=mass_summary("ban", res))
+
+    @commands.command(name="purge")
+    async def pc_purge(self, ctx:commands.Context, amount:int):
+        if not is_admin(ctx.author):
+            return
+        amount = max(1, min(PURGE_MAX, amount))
+        try: await ctx.message.delete()
+        except: pass
+        stats = await run_purge(ctx.channel, amount, actor=ctx.author, before=ctx.message)
+        if amount > 100:
+            await ctx.send(purge_summary(stats), delete_after=10)
+
+async def setup(bot):
+    await bot.add_cog(Moderation(bot))
@@ -0,0 +1,130 @@
+# =========================
+# outbound.py
+# =========================
+# Central scheduler for outgoing REST work. Moderation goes first, logs and
+# cats last; each rate-limit bucket (channel / guild) gets a small in-flight
+# cap, each guild gets a cap across all its buckets (discord.py sleeps out 429s
+# inside the request, so one busy guild must not hold every worker), and
+# low-priority work is shed when its queue backs up.
+import asyncio, itertools, time
+from collections import defaultdict, deque
+
+MOD, REPLY, TRIGGER, LOG, CAT = range(5)
+CLASS_NAMES = {MOD: "moderation", REPLY: "reply", TRIGGER: "trigger", LOG: "log", CAT: "cat"}
+MAX_DEPTH = {MOD: None, REPLY: 500, TRIGGER: 200, LOG: 1000, CAT: 50}   # queued items before shedding
+MAX_AGE = {MOD: None, REPLY: 60, TRIGGER: 30, LOG: None, CAT: 300}      # seconds; stale work is dropped
+WORKERS = 8
+PER_BUCKET = 2            # concurrent requests per bucket
+PER_GUILD = 4             # concurrent requests per guild, across its buckets (< WORKERS)
+
+class Shed(Exception):
+    pass
+
+class OutboundScheduler:
+    def __init__(self, workers:int=WORKERS, per_bucket:int=PER_BUCKET, per_guild:int=PER_GUILD):
+        self.workers = workers
+        self.per_bucket = per_bucket
+        self.per_guild = per_guild
+        self._queue: asyncio.PriorityQueue | None = None
+        self._seq = itertools.count()
+        self._tasks: list[asyncio.Task] = []
+        self._inflight: dict = defaultdict(int)     # bucket / ("g", guild_id) -> running requests
+        self._parked: dict = defaultdict(deque)     # same keys -> items waiting for that slot
+        self.stats = {c: {"depth": 0, "submitted": 0, "done": 0, "failed": 0, "shed": 0} for c in CLASS_NAMES}
+
+    def _ensure_started(self):
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def submit(self, prio:int, bucket, factory, guild:int|None=None) -> asyncio.Future:
+        # factory: zero-arg callable returning the coroutine to run; guild: owning guild id
+        # for channel buckets (("guild", id) buckets imply it)
+        self._ensure_started()
+        if guild is None and bucket[0] == "guild":
+            guild = bucket[1]
+        gkey = ("g", guild) if guild is not None else None
+        st = self.stats[prio]
+        fut = asyncio.get_running_loop().create_future()
+        cap = MAX_DEPTH[prio]
+        if cap is not None and st["depth"] >= cap:
+            st["shed"] += 1
+            fut.set_exception(Shed(CLASS_NAMES[prio]))
+            return fut
+        st["submitted"] += 1
+        st["depth"] += 1
+        self._queue.put_nowait((prio, next(self._seq), time.monotonic(), bucket, factory, fut, gkey))
+        return fut
+
+    async def run(self, prio:int, bucket, factory, guild:int|None=None):
+        return await self.submit(prio, bucket, factory, guild)
+
+    def fire(self, prio:int, bucket, factory, guild:int|None=None):
+        # fire-and-forget; errors are counted, not raised
+        self.submit(prio, bucket, factory, guild).add_done_callback(_swallow)
+
+    async def _worker(self):
+        while True:
+            item = await self._queue.get()
+            prio, _, queued_at, bucket, factory, fut, gkey = item
+            if self._inflight[bucket] >= self.per_bucket:
+                self._parked[bucket].append(item)   # picked up again when the bucket frees
+                continue
+            if gkey and self._inflight[gkey] >= self.per_guild:
+                self._parked[gkey].append(item)     # ... or when the guild frees
+                continue
+            st = self.stats[prio]
+            st["depth"] -= 1
+            age = MAX_AGE[prio]
+            if fut.cancelled():
+                continue
+            if age is not None and time.monotonic() - queued_at > age:
+                st["shed"] += 1
+                fut.set_exception(Shed(CLASS_NAMES[prio]))
+                continue
+            self._inflight[bucket] += 1
+            if gkey:
+                self._inflight[gkey] += 1
+            try:
+                res = await factory()
+                st["done"] += 1
+                if not fut.done(): fut.set_result(res)
+            except BaseException as e:
+                # includes a CancelledError raised by the job itself: the caller gets it,
+                # the worker keeps going (unless the worker itself is being cancelled)
+                st["failed"] += 1
+                if not fut.done(): fut.set_exception(e)
+                if isinstance(e, asyncio.CancelledError):
+                    if asyncio.current_task().cancelling():
+                        raise
+                elif not isinstance(e, Exception):
+                    raise   # KeyboardInterrupt / SystemExit
+            finally:
+                self._release(bucket)
+                if gkey:
+                    self._release(gkey)
+
+    def _release(self, bucket):
+        self._inflight[bucket] -= 1
+        parked = self._parked.get(bucket)
+        if parked:
+            self._queue.put_nowait(parked.popleft())
+        if not parked:
+            self._parked.pop(bucket, None)
+        if self._inflight[bucket] <= 0:
+            self._inflight.pop(bucket, None)
+
+    def metrics(self) -> dict:
+        return {CLASS_NAMES[c]: dict(v) for c, v in self.stats.items()}
+
+    def close(self):
+        for t in self._tasks:
+            t.cancel()
+        self._tasks = []
+
+def _swallow(fut:asyncio.Future):
+    if not fut.cancelled():
+        fut.exception()
+
+scheduler = OutboundScheduler()
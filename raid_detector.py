@@ -0,0 +1,54 @@
+# =========================
+# raid_detector.py
+# =========================
+# Fixed-memory sliding window of joins per guild, split by account age.
+# Every join is O(1): one ring slot bumped, totals kept incrementally.
+
+AGE_BUCKETS = (1, 7, 30)  # account age in days: <1d, <7d, <30d, older
+
+def age_bucket(age_days:float) -> int:
+    for i, limit in enumerate(AGE_BUCKETS):
+        if age_days < limit:
+            return i
+    return len(AGE_BUCKETS)
+
+class JoinRate:
+    __slots__ = ("window", "stamps", "slots", "totals", "head")
+
+    def __init__(self, window:int=60):
+        self.window = max(1, int(window))
+        n = len(AGE_BUCKETS) + 1
+        self.stamps = [-1] * self.window            # which second each slot currently holds
+        self.slots = [[0] * n for _ in range(self.window)]
+        self.totals = [0] * n                       # sums over the whole window, per age bucket
+        self.head = None                            # newest second seen
+
+    def _advance(self, sec:int):
+        if self.head is not None and sec <= self.head:
+            return
+        start = sec - self.window + 1 if self.head is None else max(self.head + 1, sec - self.window + 1)
+        for s in range(start, sec + 1):            # at most `window` steps, usually one
+            i = s % self.window
+            if self.stamps[i] != -1:
+                slot = self.slots[i]
+                for b, c in enumerate(slot):
+                    self.totals[b] -= c
+                    slot[b] = 0
+            self.stamps[i] = s
+        self.head = sec
+
+    def add(self, now:float, age_days:float):
+        sec = int(now)
+        self._advance(sec)
+        if sec < self.head - self.window + 1:
+            return  # older than the window; ignore
+        b = age_bucket(age_days)
+        self.slots[sec % self.window][b] += 1
+        self.totals[b] += 1
+
+    def count(self, now:float, younger_than_days:float|None=None) -> int:
+        # younger_than_days is rounded down to an AGE_BUCKETS boundary
+        self._advance(int(now))
+        if younger_than_days is None:
+            return sum(self.totals)
+        return sum(c for i, c in enumerate(self.totals) if i < len(AGE_BUCKETS) and AGE_BUCKETS[i] <= younger_than_days)
@@ -0,0 +1,168 @@
+# =========================
+# regex_sandbox.py
+# =========================
+# Admin-defined regex rules, evaluated in worker processes with a time budget
+# so a catastrophic-backtracking pattern can never stall the event loop.
+import asyncio, re, multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+
+MAX_PATTERN_LEN = 200
+MAX_RULES = 10            # per guild
+TIME_BUDGET = 0.25        # seconds per message (all of a guild's rules in one job)
+VALIDATE_BUDGET = 1.0     # seconds for the stress test when a rule is added
+BATCH_BUDGET = 2.0        # seconds per match_many batch (e.g. /purge pattern)
+MAX_STRIKES = 3           # timeouts before a rule is auto-disabled
+POOL_WORKERS = 2
+POOL_RETRIES = 2          # re-runs for a job whose worker was killed by another job's timeout
+
+# (x+)+ / (x*)* / (x+){n} style nesting: the usual catastrophic-backtracking shape
+_NESTED_QUANT_RE = re.compile(r"\((?:[^()\\]|\\.)*[+*}](?:[^()\\]|\\.)*\)[+*{]")
+_STRESS_INPUTS = ("a" * 4000 + "!", " " * 4000 + "!", "0" * 4000 + "x", "ab" * 2000 + "!")
+
+# ---- worker side ----
+@lru_cache(maxsize=256)
+def _compiled(pattern:str):
+    return re.compile(pattern, re.I)
+
+def _search(pattern:str, text:str) -> bool:
+    return _compiled(pattern).search(text) is not None
+
+def _first_match(patterns:list[str], text:str) -> int:
+    # index of the first pattern that matches, -1 for none
+    for i, p in enumerate(patterns):
+        if _compiled(p).search(text) is not None:
+            return i
+    return -1
+
+def _search_many(pattern:str, texts:list[str]) -> list[bool]:
+    rx = _compiled(pattern)
+    return [rx.search(t) is not None for t in texts]
+
+def _stress(pattern:str) -> bool:
+    rx = _compiled(pattern)
+    for s in _STRESS_INPUTS:
+        rx.search(s)
+    return True
+
+def _noop():
+    return True
+
+# ---- loop side ----
+class RegexSandbox:
+    def __init__(self, workers:int=POOL_WORKERS):
+        self.workers = workers
+        self._pool = None
+        self._ready = None
+        # at most one job per worker is out, so a job starts the moment it is submitted and
+        # queueing under load never eats into its budget
+        self._slots = asyncio.Semaphore(workers)
+        self.stats = {"evals": 0, "timeouts": 0, "recycles": 0, "retries": 0}
+
+    def _start(self):
+        # not fork: by now the process has the keepalive thread and an open SQLite connection.
+        # forkserver/spawn workers re-import main.py, which does no work at import
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context(method))
+        loop = asyncio.get_running_loop()
+        self._ready = asyncio.gather(*(loop.run_in_executor(self._pool, _noop) for _ in range(self.workers)), return_exceptions=True)
+
+    def _recycle(self):
+        # a running regex can't be cancelled; kill the workers and start fresh
+        pool, self._pool = self._pool, None
+        self.stats["recycles"] += 1
+        if pool:
+            for p in list((getattr(pool, "_processes", None) or {}).values()):
+                try: p.terminate()
+                except: pass
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, fn, *args, budget:float=TIME_BUDGET):
+        for attempt in range(POOL_RETRIES + 1):
+            if attempt:
+                self.stats["retries"] += 1
+            async with self._slots:
+                if self._pool is None:
+                    self._start()
+                pool, ready = self._pool, self._ready
+                await ready   # worker start-up doesn't count against the budget
+                if self._pool is not pool:
+                    continue
+                fut = asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+                try:
+                    return await asyncio.wait_for(fut, budget)
+                except asyncio.TimeoutError:
+                    self.stats["timeouts"] += 1
+                    if self._pool is pool:
+                        self._recycle()
+                    raise
+                except BrokenProcessPool:
+                    pass      # our worker was killed for someone else's timeout; not our fault
+                except asyncio.CancelledError:
+                    if asyncio.current_task().cancelling():
+                        raise     # the caller was cancelled
+                    # otherwise the pool cancelled our future while shutting down: run it again
+        raise BrokenProcessPool("regex pool was recycled")
+
+    def close(self):
+        if self._pool:
+            self._recycle()
+
+sandbox = RegexSandbox()
+
+def check_pattern(pattern:str) -> str|None:
+    # cheap static checks; returns an error message or None
+    if not pattern or len(pattern) > MAX_PATTERN_LEN:
+        return f"Pattern must be 1-{MAX_PATTERN_LEN} characters."
+    try:
+        re.compile(pattern)
+    except re.error as e:
+        return f"Invalid regex: {e}"
+    if _NESTED_QUANT_RE.search(pattern):
+        return "Nested quantifiers like `(a+)+` are not allowed."
+    return None
+
+async def validate_pattern(pattern:str) -> str|None:
+    err = check_pattern(pattern)
+    if err:
+        return err
+    try:
+        await sandbox.run(_stress, pattern, budget=VALIDATE_BUDGET)
+    except asyncio.TimeoutError:
+        return "Pattern is too slow on adversarial input."
+    except BrokenProcessPool:
+        return "Regex worker unavailable, try again."
+    return None
+
+async def match_many(pattern:str, texts:list[str]) -> list[bool]:
+    # one worker round-trip per batch; raises TimeoutError / BrokenProcessPool like run()
+    if not texts:
+        return []
+    return await sandbox.run(_search_many, pattern, texts, budget=BATCH_BUDGET)
+
+async def evaluate(rules:list[dict], text:str) -> tuple[dict|None, list[dict]]:
+    # returns (first matching rule, rules that ran out of time); all rules go to the worker
+    # as one job, only a message that blows the budget is re-run rule by rule to find the culprit
+    active = [r for r in rules if r.get("enabled", True)]
+    if not active or not text:
+        return None, []
+    sandbox.stats["evals"] += 1
+    try:
+        i = await sandbox.run(_first_match, [r["pattern"] for r in active], text)
+        return (active[i] if i >= 0 else None), []
+    except BrokenProcessPool:
+        return None, []
+    except asyncio.TimeoutError:
+        pass
+    async def one(rule):
+        try:
+            return await sandbox.run(_search, rule["pattern"], text)
+        except asyncio.TimeoutError:
+            return TimeoutError
+        except BrokenProcessPool:
+            return False   # pool recycled under us by another rule's timeout
+    results = await asyncio.gather(*(one(r) for r in active))
+    matched = next((r for r, ok in zip(active, results) if ok is True), None)
+    slow = [r for r, ok in zip(active, results) if ok is TimeoutError]
+    return matched, slow
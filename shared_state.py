@@ -0,0 +1,123 @@
+# =========================
+# shared_state.py
+# =========================
+# SQLite-backed replacement for data.json when several bot processes run
+# side by side. One row per top-level key; every write bumps a global version
+# so other processes can pull just what changed. A write re-reads the row inside
+# its transaction and three-way merges it with what we last saw, so two processes
+# touching different guilds under the same key (warns, temp_roles, afk, ...) both land.
+import json, sqlite3
+
+def _ser(v) -> str:
+    return json.dumps(v, sort_keys=True)
+
+def merge(base, ours, theirs):
+    # ours = what this process wants to write, theirs = what's stored now, base = what we
+    # last saw stored. Our changes win where both sides changed the same thing.
+    if isinstance(ours, dict) and isinstance(theirs, dict):
+        base = base if isinstance(base, dict) else {}
+        out = {}
+        for k in set(ours) | set(theirs):
+            if k in ours and k in theirs:
+                out[k] = merge(base.get(k), ours[k], theirs[k])
+            elif k in ours:
+                if k not in base or _ser(base[k]) != _ser(ours[k]):
+                    out[k] = ours[k]      # we added / changed it (or they deleted what we changed)
+            elif k not in base or _ser(base[k]) != _ser(theirs[k]):
+                out[k] = theirs[k]        # they added / changed it and we didn't delete it
+        return out
+    if isinstance(ours, list) and isinstance(theirs, list):
+        base = base if isinstance(base, list) else []
+        b, o = {_ser(x) for x in base}, {_ser(x) for x in ours}
+        removed = b - o
+        out = [x for x in theirs if _ser(x) not in removed]
+        seen = {_ser(x) for x in out}
+        out += [x for x in ours if _ser(x) not in b and _ser(x) not in seen]
+        return out
+    if base is not None and _ser(ours) == _ser(base):
+        return theirs                     # we didn't touch it
+    return ours
+
+class SharedState:
+    def __init__(self, path:str):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL, version INTEGER NOT NULL)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v INTEGER NOT NULL)")
+        self.conn.execute("INSERT OR IGNORE INTO meta (k, v) VALUES ('version', 0)")
+        self.version = 0                        # highest row version seen by this process
+        self._known: dict[str, str] = {}        # key -> last serialized value we read or wrote
+        self._data_version = None
+
+    def empty(self) -> bool:
+        return self.conn.execute("SELECT COUNT(*) FROM state").fetchone()[0] == 0
+
+    def load(self) -> dict:
+        out = {}
+        for key, value, version in self.conn.execute("SELECT key, value, version FROM state"):
+            out[key] = json.loads(value)
+            self._known[key] = value
+            self.version = max(self.version, version)
+        self._data_version = self._pragma_version()
+        return out
+
+    def save(self, d:dict):
+        changed = []
+        for key, val in d.items():
+            ser = _ser(val)
+            if self._known.get(key) != ser:
+                changed.append((key, ser))
+        if not changed:
+            return
+        cur = self.conn.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            rows = []
+            for k, ser in changed:
+                row = cur.execute("SELECT value FROM state WHERE key=?", (k,)).fetchone()
+                if row and row[0] != self._known.get(k):
+                    # someone else wrote this key since we last read it: merge, don't clobber
+                    base = json.loads(self._known[k]) if k in self._known else None
+                    ser = _ser(merge(base, d[k], json.loads(row[0])))
+                rows.append((k, ser))
+            v = cur.execute("SELECT v FROM meta WHERE k='version'").fetchone()[0] + 1
+            cur.execute("UPDATE meta SET v=? WHERE k='version'", (v,))
+            cur.executemany("INSERT INTO state (key, value, version) VALUES (?, ?, ?) "
+                            "ON CONFLICT(key) DO UPDATE SET value=excluded.value, version=excluded.version",
+                            [(k, ser, v) for k, ser in rows])
+            cur.execute("COMMIT")
+        except:
+            cur.execute("ROLLBACK")
+            raise
+        for k, ser in rows:
+            if self._known.get(k) is None or _ser(d[k]) != ser:
+                # pick up the other process's part in place, so references into data stay valid
+                merged = json.loads(ser)
+                if isinstance(d[k], dict) and isinstance(merged, dict):
+                    d[k].clear(); d[k].update(merged)
+                elif isinstance(d[k], list) and isinstance(merged, list):
+                    d[k][:] = merged
+                else:
+                    d[k] = merged
+            self._known[k] = ser
+
+    def _pragma_version(self) -> int:
+        # changes whenever *another* connection commits; a cheap "anything new?" check
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def poll(self) -> dict:
+        # returns {key: value} written by other processes since the last poll
+        dv = self._pragma_version()
+        if dv == self._data_version:
+            return {}
+        self._data_version = dv
+        out = {}
+        rows = self.conn.execute("SELECT key, value, version FROM state WHERE version > ?", (self.version,)).fetchall()
+        for key, value, version in rows:
+            self.version = max(self.version, version)
+            if self._known.get(key) != value:
+                self._known[key] = value
+                out[key] = json.loads(value)
+        return out
@@ -0,0 +1,77 @@
+import re
+
+import pytest
+
+from content_scan import MessageScan
+
+# the checks main.py used before the shared scan; has_link / has_invite must agree with them
+BASE_LINK = re.compile(r"(https?://|www\.)", re.I)
+BASE_INVITE = re.compile(r"(discord\.gg/|discord\.com/invite/)", re.I)
+
+LINK_CASES = [
+    "hello there",
+    "https://example.com",
+    "see www.example.com now",
+    "xhttps://evil.com",
+    "joindiscord.gg/abc",
+    "join discord.gg/abc",
+    "https://discord.com/invite/abc",
+    "xdiscord.com/invite/abc",
+    "HTTP://SHOUTING.COM",
+    "word_www.glued.com",
+    "<@123>https://after-mention.com",
+    "discord.gg without a slash",
+    "http:/ not quite",
+    "ftp://not-a-link-for-us",
+]
+
+@pytest.mark.parametrize("text", LINK_CASES)
+def test_link_parity_with_baseline(text):
+    s = MessageScan(text)
+    assert s.has_link == bool(BASE_LINK.search(text))
+    assert s.has_invite == bool(BASE_INVITE.search(text))
+
+def test_glued_prefix_still_detected():
+    assert MessageScan("xhttps://evil.com").has_link
+    assert MessageScan("joindiscord.gg/abc").has_invite
+
+def test_mentions_and_words():
+    s = MessageScan("hi <@!42> and <@7>, check https://a.b/c")
+    assert s.mentions == {42, 7}
+    assert {"hi", "and", "check"} <= s.words
+    assert s.urls == ["https://a.b/c"]
+
+def test_has_word_is_whole_word():
+    s = MessageScan("the classic assessment")
+    assert s.has_word("classic")
+    assert not s.has_word("ass")
+    assert MessageScan("New York is big").has_word("new york")
+
+BLOCKED = ["ass", "tit", "sex", "bad"]
+
+@pytest.mark.parametrize("text", [
+    "my score was 455 today",
+    "call 717 area code",
+    "room 5 3 x",
+    "the classic assessment",
+    "it's 5pm, see you at 8",
+    "a b c",
+])
+def test_normalizer_leaves_innocent_text_alone(text):
+    assert MessageScan(text).first_blocked(BLOCKED) is None
+
+@pytest.mark.parametrize("text, hit", [
+    ("you are b a d", "bad"),
+    ("a b a d idea", "bad"),
+    ("b.a.d", "bad"),
+    ("b_a_d", "bad"),
+    ("b\u200bad", "bad"),    # zero-width space
+    ("b\u0430d", "bad"),    # cyrillic a
+    ("b\u00e0d", "bad"),
+    ("what a t1t", "tit"),
+    ("a$$", "ass"),
+    ("s3x", "sex"),
+    ("bad!", "bad"),         # plain text still wins when the leet view changes it
+])
+def test_normalizer_catches_obfuscation(text, hit):
+    assert MessageScan(text).first_blocked(BLOCKED) == hit
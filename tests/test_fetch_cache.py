@@ -0,0 +1,58 @@
+import asyncio
+
+from fetch_cache import FetchCache
+
+def test_concurrent_lookups_share_one_request():
+    async def main():
+        c = FetchCache(max_items=10, ttl=60)
+        calls = 0
+        async def factory():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "user"
+        res = await asyncio.gather(*(c.fetch(1, factory) for _ in range(5)))
+        again = await c.fetch(1, factory)
+        return res, again, calls, c.stats()
+    res, again, calls, st = asyncio.run(main())
+    assert res == ["user"] * 5 and again == "user"
+    assert calls == 1
+    assert (st["misses"], st["joined"], st["hits"]) == (1, 4, 1)
+
+def test_one_caller_cancelling_does_not_cancel_the_others():
+    async def main():
+        c = FetchCache(max_items=10, ttl=60)
+        async def factory():
+            await asyncio.sleep(0.02)
+            return "user"
+        a = asyncio.ensure_future(c.fetch(1, factory))
+        b = asyncio.ensure_future(c.fetch(1, factory))
+        await asyncio.sleep(0)
+        a.cancel()
+        return await b, c.get(1)
+    assert asyncio.run(main()) == ("user", "user")
+
+def test_none_and_errors_are_not_cached():
+    async def main():
+        c = FetchCache(max_items=10, ttl=60)
+        async def none():
+            return None
+        async def boom():
+            raise LookupError
+        await c.fetch(1, none)
+        try:
+            await c.fetch(2, boom)
+        except LookupError:
+            pass
+        return len(c)
+    assert asyncio.run(main()) == 0
+
+def test_ttl_and_size_bound(monkeypatch):
+    import fetch_cache
+    now = [1000.0]
+    monkeypatch.setattr(fetch_cache.time, "monotonic", lambda: now[0])
+    c = FetchCache(max_items=2, ttl=10)
+    c.put(1, "a"); c.put(2, "b"); c.put(3, "c")
+    assert c.get(1) is None and len(c) == 2
+    now[0] += 11
+    assert c.get(2) is None
@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from fingerprints import simhash, DupeIndex, MAX_DISTANCE, BITS
+
+def flip(fp:int, n:int, rng:random.Random) -> int:
+    for i in rng.sample(range(BITS), n):
+        fp ^= 1 << i
+    return fp
+
+@pytest.mark.parametrize("dist", range(MAX_DISTANCE + 1))
+def test_band_recall_within_max_distance(dist):
+    # pigeonhole: every pair within MAX_DISTANCE bits shares a band, so none may be missed
+    rng = random.Random(dist)
+    for trial in range(300):
+        idx = DupeIndex()
+        a = rng.getrandbits(BITS)
+        b = flip(a, dist, rng)
+        idx.add(0, a, 1, 10, 100, window=60)
+        assert [e[2] for e in idx.add(1, b, 2, 10, 101, window=60)] == [1]
+
+def test_far_fingerprints_do_not_match():
+    rng = random.Random(1)
+    idx = DupeIndex()
+    a = rng.getrandbits(BITS)
+    idx.add(0, a, 1, 10, 100, window=60)
+    assert idx.add(1, flip(a, MAX_DISTANCE + 6, rng), 2, 10, 101, window=60) == []
+
+def test_one_word_added_or_dropped_is_a_near_duplicate():
+    base = "free nitro giveaway click the link below to claim your prize now".split()
+    for variant in (base + ["today"], ["hey"] + base, base[1:], base[:-1]):
+        assert (simhash(base) ^ simhash(variant)).bit_count() <= MAX_DISTANCE
+
+def test_unrelated_text_is_not():
+    a = "free nitro giveaway click the link below to claim your prize now".split()
+    b = "anyone up for a match tonight after the race finishes".split()
+    assert (simhash(a) ^ simhash(b)).bit_count() > MAX_DISTANCE
+
+def test_window_and_size_eviction():
+    idx = DupeIndex(max_entries=3)
+    for i in range(5):
+        idx.add(i, 42, i, 10, 100, window=60)
+    assert len(idx) == 3
+    assert idx.add(100, 42, 99, 10, 100, window=10) == []
+    assert len(idx) == 1
+    assert all(len(b) <= 1 for bands in idx.bands for b in bands.values())
@@ -0,0 +1,35 @@
+from types import SimpleNamespace as NS
+
+from guild_index import GuildIndex
+
+def guild(gid, name, members, joined=0.0):
+    me = NS(joined_at=NS(timestamp=lambda: joined))
+    return NS(id=gid, name=name, member_count=members, me=me, shard_id=0)
+
+def names(rows):
+    return [r["name"] for r in rows]
+
+def test_sorts_and_search():
+    idx = GuildIndex()
+    idx.rebuild([guild(1, "Bravo", 10, 3), guild(2, "alpha", 50, 1), guild(3, "Charlie", 30, 2)])
+    assert names(idx.query("members")) == ["alpha", "Charlie", "Bravo"]
+    assert names(idx.query("name")) == ["alpha", "Bravo", "Charlie"]
+    assert names(idx.query("joined")) == ["alpha", "Charlie", "Bravo"]
+    assert names(idx.query("name", "AL")) == ["alpha"]
+    assert names(idx.query("name", "3")) == ["Charlie"]   # by id too
+
+def test_upsert_and_remove_refresh_orders():
+    idx = GuildIndex()
+    idx.rebuild([guild(1, "Bravo", 10), guild(2, "alpha", 50)])
+    assert names(idx.query("name")) == ["alpha", "Bravo"]
+    idx.upsert(guild(1, "Aardvark", 10))
+    assert names(idx.query("name")) == ["Aardvark", "alpha"]
+    idx.remove(2)
+    assert names(idx.query("name")) == ["Aardvark"] and len(idx) == 1
+
+def test_member_bumps_never_go_negative():
+    idx = GuildIndex()
+    idx.rebuild([guild(1, "Bravo", 1)])
+    idx.bump_members(1, -5)
+    idx.bump_members(99, 1)   # unknown guild: ignored
+    assert idx.query()[0]["members"] == 0
@@ -0,0 +1,31 @@
+from message_cache import ContentCache, ENTRY_OVERHEAD
+
+def test_put_get_pop_tracks_bytes():
+    c = ContentCache(max_bytes=10_000)
+    c.put(1, 10, 100, "hello")
+    assert c.get(1) == (10, 100, "hello", None)
+    assert c.bytes == ENTRY_OVERHEAD + 5
+    assert c.pop(1) == (10, 100, "hello", None)
+    assert c.bytes == 0 and len(c) == 0
+
+def test_evicts_oldest_over_budget():
+    c = ContentCache(max_bytes=3 * (ENTRY_OVERHEAD + 10))
+    for i in range(5):
+        c.put(i, 1, 1, "x" * 10)
+    assert len(c) == 3
+    assert c.get(0) is None and c.get(1) is None and c.get(4) is not None
+    assert c.bytes <= c.max_bytes
+
+def test_update_content_keeps_author_and_attachment():
+    c = ContentCache(max_bytes=10_000)
+    c.put(1, 10, 100, "before", "https://cdn/a.png")
+    c.update_content(1, "after, and longer")
+    assert c.get(1) == (10, 100, "after, and longer", "https://cdn/a.png")
+    assert c.bytes == ENTRY_OVERHEAD + len("after, and longer") + len("https://cdn/a.png")
+    c.update_content(2, "never cached")
+    assert c.get(2) is None
+
+def test_multibyte_content_is_counted_in_bytes():
+    c = ContentCache(max_bytes=10_000)
+    c.put(1, 1, 1, "é" * 10)
+    assert c.bytes == ENTRY_OVERHEAD + 20
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from outbound import OutboundScheduler, Shed, MOD, LOG, CAT, MAX_DEPTH
+
+def test_priority_order():
+    async def main():
+        s = OutboundScheduler(workers=1)
+        order = []
+        gate = asyncio.Event()
+        async def job(name):
+            if name == "first":
+                await gate.wait()
+            order.append(name)
+        first = s.submit(LOG, ("ch", 1), lambda: job("first"))
+        await asyncio.sleep(0)
+        futs = [s.submit(CAT, ("ch", 2), lambda: job("cat")), s.submit(LOG, ("ch", 3), lambda: job("log")),
+                s.submit(MOD, ("guild", 4), lambda: job("mod"))]
+        gate.set()
+        await asyncio.gather(first, *futs)
+        s.close()
+        return order
+    assert asyncio.run(main()) == ["first", "mod", "log", "cat"]
+
+def test_per_guild_cap():
+    async def main():
+        s = OutboundScheduler(workers=8, per_bucket=8, per_guild=2)
+        running = peak = 0
+        async def job():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+        await asyncio.gather(*(s.run(MOD, ("ch", i), job, guild=1) for i in range(10)))
+        s.close()
+        return peak
+    assert asyncio.run(main()) == 2
+
+def test_low_priority_is_shed_when_backed_up():
+    async def main():
+        s = OutboundScheduler(workers=1)
+        gate = asyncio.Event()
+        futs = [s.submit(CAT, ("ch", 1), gate.wait) for _ in range(MAX_DEPTH[CAT] + 5)]
+        gate.set()
+        res = await asyncio.gather(*futs, return_exceptions=True)
+        s.close()
+        return res
+    assert sum(isinstance(r, Shed) for r in asyncio.run(main())) >= 5
+
+def test_job_errors_reach_the_caller_and_workers_survive():
+    async def main():
+        s = OutboundScheduler(workers=1)
+        async def boom():
+            raise ValueError("x")
+        async def cancelled():
+            raise asyncio.CancelledError()
+        with pytest.raises(ValueError):
+            await s.run(MOD, ("guild", 1), boom)
+        with pytest.raises(asyncio.CancelledError):
+            await s.run(MOD, ("guild", 1), cancelled)
+        async def ok():
+            return 7
+        res = await s.run(MOD, ("guild", 1), ok)
+        s.close()
+        return res
+    assert asyncio.run(main()) == 7
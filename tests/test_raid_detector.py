@@ -0,0 +1,29 @@
+from raid_detector import JoinRate, age_bucket, AGE_BUCKETS
+
+def test_age_buckets():
+    assert [age_bucket(a) for a in (0.5, 3, 20, 400)] == [0, 1, 2, len(AGE_BUCKETS)]
+
+def test_counts_inside_window_only():
+    jr = JoinRate(window=10)
+    for t in range(100, 105):
+        jr.add(t, 400)
+    jr.add(104, 0.5)
+    assert jr.count(104) == 6
+    assert jr.count(104, younger_than_days=7) == 1
+    assert jr.count(109) == 6
+    assert jr.count(110) == 5      # the join at t=100 left the window
+    assert jr.count(200) == 0
+
+def test_late_and_stale_joins():
+    jr = JoinRate(window=10)
+    jr.add(100, 400)
+    jr.add(95, 400)     # slightly out of order, still inside the window
+    jr.add(50, 400)     # older than the window: ignored
+    assert jr.count(100) == 2
+
+def test_memory_is_fixed():
+    jr = JoinRate(window=5)
+    for t in range(10_000):
+        jr.add(t, 400)
+    assert len(jr.slots) == 5
+    assert jr.count(9_999) == 5
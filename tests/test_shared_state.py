@@ -0,0 +1,33 @@
+from shared_state import SharedState, merge
+
+def test_merge_dicts_per_key():
+    base = {"1": {"a": 1}, "2": {"b": 2}}
+    ours = {"1": {"a": 1, "x": 9}, "2": {"b": 2}}           # we added under guild 1
+    theirs = {"1": {"a": 1}, "2": {"b": 2}, "3": {"c": 3}}  # they added guild 3
+    assert merge(base, ours, theirs) == {"1": {"a": 1, "x": 9}, "2": {"b": 2}, "3": {"c": 3}}
+
+def test_merge_deletes_on_either_side():
+    base = {"a": 1, "b": 2}
+    assert merge(base, {"b": 2}, {"a": 1, "b": 2}) == {"b": 2}   # we deleted a
+    assert merge(base, {"a": 1, "b": 2}, {"a": 1}) == {"a": 1}   # they deleted b
+
+def test_merge_lists_as_add_remove():
+    base = [1, 2, 3]
+    assert merge(base, [1, 2, 3, 4], [2, 3, 5]) == [2, 3, 5, 4]
+
+def test_merge_scalars_ours_wins_unless_untouched():
+    assert merge(1, 2, 3) == 2
+    assert merge(1, 1, 3) == 3
+
+def test_two_processes_writing_the_same_key(tmp_path):
+    path = str(tmp_path / "state.db")
+    a, b = SharedState(path), SharedState(path)
+    da = {"warns": {}}
+    a.save(da)
+    db = b.load()
+    da["warns"]["1"] = ["a"]
+    a.save(da)
+    db["warns"]["2"] = ["b"]
+    b.save(db)
+    assert db["warns"] == {"1": ["a"], "2": ["b"]}
+    assert a.poll() == {"warns": {"1": ["a"], "2": ["b"]}}
@@ -0,0 +1,68 @@
+# =========================
+# triggers.py
+# =========================
+# Admin-set auto-replies: one whole-word trigger per message.
+import discord
+from discord.ext import commands
+from discord import app_commands
+
+from content_scan import scan_message, MessageScan
+from outbound import scheduler, TRIGGER
+from core import data, save_data, AM, trigger_map, app_cmd_check_admin, app_cmd_check_blacklist
+
+def word_match(scan:MessageScan, word:str) -> bool:
+    # match as whole word (case-insensitive), against the shared per-message scan
+    return scan.has_word(word)
+
+class Triggers(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.Cog.listener()
+    async def on_message(self, message:discord.Message):
+        if not message.guild or message.author.bot:
+            return
+        tm = data.get("triggers", {}).get(str(message.guild.id))
+        if not tm:
+            return
+        scan = scan_message(message)
+        for word, reply in tm.items():
+            if word_match(scan, word):
+                scheduler.fire(TRIGGER, ("ch", message.channel.id),
+                               lambda: message.reply(reply, mention_author=False, allowed_mentions=discord.AllowedMentions.none()),
+                               guild=message.guild.id)
+                break  # one trigger per message
+
+    @app_commands.command(name="trigger_add", description="Admin: add a trigger reply.")
+    @app_cmd_check_admin()
+    @app_commands.describe(word="Exact word to match", reply="What bot should reply")
+    async def slash_trigger_add(self, inter:discord.Interaction, word:str, reply:str):
+        m = trigger_map(inter.guild.id)
+        m[word] = reply
+        save_data(data)
+        await inter.response.send_message(f"Added trigger `{word}` → `{reply}`")
+
+    @app_commands.command(name="trigger_remove", description="Admin: remove a trigger.")
+    @app_cmd_check_admin()
+    @app_commands.describe(word="Word to remove")
+    async def slash_trigger_remove(self, inter:discord.Interaction, word:str):
+        m = trigger_map(inter.guild.id)
+        if word in m:
+            m.pop(word)
+            save_data(data)
+            await inter.response.send_message(f"Removed trigger `{word}`")
+        else:
+            await inter.response.send_message("No such trigger.", ephemeral=True)
+
+    @app_commands.command(name="trigger_list", description="List current triggers.")
+    @app_cmd_check_blacklist()
+    async def slash_trigger_list(self, inter:discord.Interaction):
+        m = trigger_map(inter.guild.id)
+        if not m:
+            await inter.response.send_message("No triggers set.")
+            return
+        desc = "\n".join([f"`{w}` → `{r}`" for w, r in m.items()])
+        await inter.response.send_message(embed=AM(0x5865F2, "Triggers", desc))
+
+async def setup(bot):
+    await bot.add_cog(Triggers(bot))
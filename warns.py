@@ -0,0 +1,117 @@
+# =========================
+# warns.py
+# =========================
+# Warn commands and escalation config; the warn store and escalation live in core.
+import time
+
+import discord
+from discord.ext import commands
+from discord import app_commands
+
+from core import (data, save_data, AM, warns_map, warn_cfg, warn_active, add_warn, active_warn_count,
+                  app_cmd_check_admin)
+
+WARNS_PER_PAGE = 10
+
+class WarnPages(discord.ui.View):
+    def __init__(self, owner_id:int, user:discord.abc.User, warns:list[dict], cfg:dict, page:int=0):
+        super().__init__(timeout=120)
+        self.owner_id = owner_id
+        self.user = user
+        self.warns = warns
+        self.cfg = cfg
+        self.pages = max(1, -(-len(warns) // WARNS_PER_PAGE))
+        self.page = max(0, min(self.pages-1, page))
+        self.sync_buttons()
+
+    def sync_buttons(self):
+        self.prev.disabled = self.page == 0
+        self.next.disabled = self.page >= self.pages - 1
+
+    def build_embed(self):
+        now = time.time()
+        active = sum(1 for w in self.warns if warn_active(w, self.cfg, now))
+        start = self.page * WARNS_PER_PAGE
+        lines = []
+        for i, w in enumerate(self.warns[start:start+WARNS_PER_PAGE], start+1):
+            line = f"{i}. <t:{w['ts']}:R> by <@{w['mod']}> — {w['reason']}"[:350]
+            lines.append(line if warn_active(w, self.cfg, now) else f"~~{line}~~ (expired)")
+        e = AM(0xEFBF3E, f"Warns for {self.user} — {active} active / {len(self.warns)} total", "\n".join(lines)[:4000])
+        e.set_footer(text=f"Page {self.page+1}/{self.pages}")
+        return e
+
+    async def interaction_check(self, interaction:discord.Interaction) -> bool:
+        if interaction.user.id != self.owner_id:
+            await interaction.response.send_message("This menu isn't for you.", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="⬅️", style=discord.ButtonStyle.secondary)
+    async def prev(self, interaction:discord.Interaction, button:discord.ui.Button):
+        self.page = max(0, self.page-1)
+        self.sync_buttons()
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+    @discord.ui.button(label="➡️", style=discord.ButtonStyle.secondary)
+    async def next(self, interaction:discord.Interaction, button:discord.ui.Button):
+        self.page = min(self.pages-1, self.page+1)
+        self.sync_buttons()
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+class Warns(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @app_commands.command(name="warn", description="Admin: warn a user.")
+    @app_cmd_check_admin()
+    @app_commands.describe(user="User", reason="Reason")
+    async def slash_warn(self, inter:discord.Interaction, user:discord.Member, reason:str):
+        await inter.response.defer()   # escalation may call the API
+        count, done = await add_warn(inter.guild, user, reason, inter.user.id)
+        msg = f"Warned {user.mention}: {reason} ({count} active)"
+        if done:
+            msg += f"\nEscalation: {done}."
+        await inter.followup.send(msg)
+
+    @app_commands.command(name="warn_list", description="Show warns for a user.")
+    @app_cmd_check_admin()
+    @app_commands.describe(user="User", page="Page to open (default: latest)")
+    async def slash_warn_list(self, inter:discord.Interaction, user:discord.Member, page:int=None):
+        arr = warns_map(inter.guild.id).get(str(user.id), [])
+        if not arr:
+            await inter.response.send_message("No warns.", ephemeral=True)
+            return
+        v = WarnPages(inter.user.id, user, arr, warn_cfg(inter.guild.id), (page - 1) if page else 10**9)
+        await inter.response.send_message(embed=v.build_embed(), view=v)
+
+    @app_commands.command(name="warn_remove", description="Remove a warn by index.")
+    @app_cmd_check_admin()
+    @app_commands.describe(user="User", index="Warn number (1..N)")
+    async def slash_warn_remove(self, inter:discord.Interaction, user:discord.Member, index:int):
+        wm = warns_map(inter.guild.id)
+        arr = wm.get(str(user.id), [])
+        if 1 <= index <= len(arr):
+            arr.pop(index-1)
+            save_data(data)
+            await inter.response.send_message(f"Removed warn. {active_warn_count(inter.guild.id, user.id)} active left.")
+        else:
+            await inter.response.send_message("Invalid index.", ephemeral=True)
+
+    @app_commands.command(name="warn_config", description="Admin: warn decay and escalation steps.")
+    @app_cmd_check_admin()
+    @app_commands.describe(decay_days="Days a warn keeps counting (0 = forever)", timeout_at="Active warns for a timeout (0 = off)",
+                           timeout_secs="Timeout length in seconds", kick_at="Active warns for a kick (0 = off)",
+                           ban_at="Active warns for a ban (0 = off)")
+    async def slash_warn_config(self, inter:discord.Interaction, decay_days:int=None, timeout_at:int=None, timeout_secs:int=None,
+                                kick_at:int=None, ban_at:int=None):
+        cfg = data.setdefault("warn_policy", {}).setdefault(str(inter.guild.id), {})
+        if decay_days is not None: cfg["decay_days"] = max(0, decay_days)
+        if timeout_at is not None: cfg["timeout_at"] = max(0, timeout_at)
+        if timeout_secs is not None: cfg["timeout_secs"] = max(60, min(28*86400, timeout_secs))
+        if kick_at is not None: cfg["kick_at"] = max(0, kick_at)
+        if ban_at is not None: cfg["ban_at"] = max(0, ban_at)
+        save_data(data)
+        await inter.response.send_message(f"Warn config: `{warn_cfg(inter.guild.id)}`")
+
+async def setup(bot):
+    await bot.add_cog(Warns(bot))